@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+异步数据提取模块
+基于 oracledb 的 asyncio 接口（异步连接池、异步游标）执行报表查询，
+可与心跳、邮件发送等其他协程在同一个事件循环中并发运行
+"""
+
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+import pyarrow as pa
+from config import QUERY_CONFIG
+from database_extractor import DatabaseExtractor
+from report_writers import arrow_schema
+from db_pool import create_async_pool
+
+
+async def chain_async(head, tail=None):
+    """先产出 head 中的元素，再产出异步迭代器 tail 中的元素"""
+    for item in head:
+        yield item
+    if tail is not None:
+        async for item in tail:
+            yield item
+
+
+class AsyncDatabaseExtractor(DatabaseExtractor):
+    """基于asyncio的数据提取器
+
+    各报表查询作为协程并发执行，等待数据库往返时不占用线程；
+    写入报表文件是CPU密集的同步操作，放到工作线程执行，避免阻塞事件循环。
+    增量提取和分区并行的查询沿用同步实现，在工作线程中通过同步连接池执行；
+    启用本地副本（REPLICA_CONFIG）时全部查询都在工作线程中通过SQLite连接执行。
+    只支持流式提取（QUERY_CONFIG['streaming']），异步连接只支持oracledb Thin模式。
+    """
+
+    def __init__(self, use_cache=True, params=None, metrics=None, pool_factory=None):
+        super().__init__(use_cache=use_cache, params=params, metrics=metrics)
+        self.logger = logging.getLogger(__name__)
+
+        # 创建异步连接池的函数，连接池在每次提取开始时创建、结束时关闭
+        self.pool_factory = pool_factory or create_async_pool
+        self.pool = None
+
+    async def get_async_connection(self):
+        """从异步连接池获取连接，等待时间计入 db_connect 阶段"""
+        with self.metrics.phase('db_connect'):
+            return await self.pool.acquire()
+
+    async def open_stream_cursor_async(self, connection, sql, params=None):
+        """在异步连接上执行SQL查询，返回已配置批量读取参数的游标"""
+        cursor = connection.cursor()
+        cursor.arraysize = QUERY_CONFIG.get('fetch_arraysize', 5000)
+        cursor.prefetchrows = QUERY_CONFIG.get('fetch_prefetchrows', cursor.arraysize + 1)
+        with self.metrics.phase('db_execute'):
+            await cursor.execute(sql, params)
+        return cursor
+
+    async def iter_batches_async(self, cursor):
+        """按批次读取异步游标数据，读取完毕后关闭游标"""
+        total = 0
+        try:
+            while True:
+                with self.metrics.phase('db_fetch'):
+                    rows = await cursor.fetchmany()
+                if not rows:
+                    break
+                total += len(rows)
+                self.metrics.count('rows_fetched', len(rows))
+                yield rows
+        finally:
+            cursor.close()
+            self.logger.info(f"流式读取完成，共 {total} 条记录")
+
+    async def iter_arrow_batches_async(self, connection, sql, params=None):
+        """以Arrow列式批次读取查询结果（异步连接的 fetch_df_batches）"""
+        total = 0
+        data_frames = connection.fetch_df_batches(sql, parameters=params, size=QUERY_CONFIG.get('fetch_arraysize', 5000))
+        while True:
+            with self.metrics.phase('db_fetch'):
+                data_frame = await anext(data_frames, None)
+                if data_frame is None:
+                    break
+                table = pa.table(data_frame)
+            total += table.num_rows
+            self.metrics.count('rows_fetched', table.num_rows)
+            yield table
+        self.logger.info(f"列式读取完成，共 {total} 条记录")
+
+    async def describe_query_async(self, connection, sql):
+        """只解析不执行，获取查询的列名"""
+        cursor = connection.cursor()
+        try:
+            await cursor.parse(sql)
+            return [col[0] for col in cursor.description]
+        finally:
+            cursor.close()
+
+    def write_cached_batch(self, sheet, batch, write_lock, entry):
+        """写入一个批次，并追加到正在写入的缓存条目"""
+        self.write_batch(sheet, batch, write_lock)
+        if entry is not None:
+            entry.append(batch)
+
+    async def write_query_sheet_async(self, query, sheet, write_lock):
+        """在异步连接上执行一个报表查询，并将结果写入对应工作表"""
+        params = self.bind_params(query['sql'])
+        columnar = query.get('fetch_mode', QUERY_CONFIG.get('fetch_mode', 'tuple')) == 'arrow'
+
+        # 增量提取和分区并行依赖本地行存储和多连接拉取，沿用同步实现；SQLite副本没有异步接口
+        if self.source != 'oracle' or query.get('incremental_column') or query.get('parallel_degree', 1) > 1:
+            return await asyncio.to_thread(self.write_query_sheet, query, sheet, write_lock)
+
+        # 命中结果缓存时不占用数据库连接
+        if self.cache is not None:
+            cached = self.cache.get(query['sql'], params)
+            if cached:
+                columns, batches, schema = cached
+                return await asyncio.to_thread(self.write_batches, query, sheet, columns, batches, write_lock, schema)
+
+        connection = await self.get_async_connection()
+        try:
+            # 列式模式的批次自带类型，不需要另给表结构
+            schema = None
+            if columnar:
+                # 列式模式：列名取自首个Arrow批次，空结果时解析SQL获取
+                tables = self.iter_arrow_batches_async(connection, query['sql'], params)
+                first = await anext(tables, None)
+                if first is None:
+                    columns, batches = await self.describe_query_async(connection, query['sql']), chain_async([])
+                else:
+                    columns, batches = first.column_names, chain_async([first], tables)
+            else:
+                cursor = await self.open_stream_cursor_async(connection, query['sql'], params)
+                columns = [col[0] for col in cursor.description]
+                schema = arrow_schema(cursor.description)
+                batches = self.iter_batches_async(cursor)
+
+            sheet.set_columns(columns, schema)
+            start = time.perf_counter()
+
+            # 边写报表边写缓存，全部批次写完后缓存条目才生效
+            entry = self.cache.open_entry(query['sql'], params, columns, schema) if self.cache is not None else None
+            try:
+                async for batch in batches:
+                    await asyncio.to_thread(self.write_cached_batch, sheet, batch, write_lock, entry)
+            except BaseException:
+                if entry is not None:
+                    entry.discard()
+                raise
+            if entry is not None:
+                entry.commit()
+
+            return self.finish_sheet(query, sheet, start)
+
+        finally:
+            await connection.close()
+
+    async def run_targets_async(self, targets):
+        """在异步连接池上并发执行 (查询, 工作表, 写入锁) 列表中的各查询，返回失败的查询名称列表"""
+        self.pool = self.pool_factory() if self.source == 'oracle' else None
+        try:
+            # 同时执行的查询数与同步实现的线程数一致
+            max_workers = max(1, min(QUERY_CONFIG.get('max_workers', 3), len(targets)))
+            semaphore = asyncio.Semaphore(max_workers)
+            self.logger.info(f"开始执行 {len(targets)} 个报表查询（asyncio），并发数 {max_workers}")
+
+            async def run_query(query, sheet, write_lock):
+                async with semaphore:
+                    return await self.write_query_sheet_async(query, sheet, write_lock)
+
+            results = await asyncio.gather(
+                *(run_query(query, sheet, write_lock) for query, sheet, write_lock in targets),
+                return_exceptions=True
+            )
+
+            failed = []
+            for (query, _, _), result in zip(targets, results):
+                if isinstance(result, BaseException):
+                    self.logger.error(f"报表查询 {query['name']} 失败: {str(result)}")
+                    failed.append(query['name'])
+                else:
+                    self.logger.info(f"报表查询 {query['name']} 完成，共 {result} 条记录")
+            return failed
+
+        finally:
+            if self.pool is not None:
+                await self.pool.close(force=True)
+                self.pool = None
+                self.logger.info("异步数据库连接池已关闭")
+
+    async def extract_queries_async(self, queries):
+        """并发执行多个报表查询（协程），按各自的输出格式写入报表文件
+
+        返回生成的文件路径列表，任一查询失败时返回 None。
+        """
+        writers = []
+        try:
+            targets = self.open_writers(queries, writers)
+            failed = await self.run_targets_async(targets)
+            return await asyncio.to_thread(self.close_writers, writers, failed)
+
+        except Exception as e:
+            self.logger.error(f"保存报表文件失败: {str(e)}")
+            for writer, _ in writers:
+                writer.discard()
+            return None
+
+    async def extract_queries_fingerprinted_async(self, queries):
+        """写入报表的同时计算内容指纹，内容未变化时不保留报表文件"""
+        spool_dir = tempfile.mkdtemp(prefix='fingerprint_')
+        writers = []
+        try:
+            targets = self.open_fingerprinted(queries, spool_dir, writers)
+            failed = await self.run_targets_async(targets)
+            return await asyncio.to_thread(self.finish_fingerprinted, queries, targets, writers, failed)
+
+        except Exception as e:
+            self.logger.error(f"保存报表文件失败: {str(e)}")
+            for writer, _ in writers:
+                writer.discard()
+            return None
+
+        finally:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+    async def extract_and_save_async(self):
+        """执行完整的数据提取和保存流程，返回生成的文件路径列表"""
+        try:
+            self.logger.info("开始数据提取流程（asyncio）")
+            self.fingerprint = None
+            self.unchanged = False
+
+            # 启用内容指纹时边写入边计算，内容未变化则返回空列表
+            if self.fingerprint_store is not None:
+                files = await self.extract_queries_fingerprinted_async(self.report_queries())
+                if self.unchanged:
+                    self.output_files = []
+                    return []
+            else:
+                files = await self.extract_queries_async(self.report_queries())
+            if not files:
+                return None
+
+            self.output_files = files
+            return files
+
+        except Exception as e:
+            self.logger.error(f"数据提取流程失败: {str(e)}")
+            return None
+
+    def extract_and_save(self):
+        """同步入口：在新的事件循环中运行 extract_and_save_async"""
+        return asyncio.run(self.extract_and_save_async())
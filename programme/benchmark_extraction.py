@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+数据提取性能基准测试
+在本地SQLite数据库（结构与 OUTPATIENT_RECORDS 一致）上驱动 DatabaseExtractor，
+按数据量、输出格式和读取模式记录 行/秒、峰值内存 和 输出文件大小，
+并与保存的基线比较，退化超过阈值时以非零状态退出
+
+用法:
+    python benchmark_extraction.py                      # 与基线比较
+    python benchmark_extraction.py --save-baseline      # 将本次结果保存为基线
+    python benchmark_extraction.py --sizes 10000,100000 --formats csv,parquet --modes tuple
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+FETCH_MODES = ['tuple', 'arrow']
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+DEPARTMENTS = ["内科", "外科", "儿科", "妇科", "骨科", "眼科", "皮肤科"]
+DIAGNOSES = ["感冒", "高血压", "糖尿病", "骨折", "胃炎", "头痛", "过敏", "失眠"]
+DOCTORS = [f"医生{chr(65 + i)}" for i in range(20)]
+
+BENCH_SQL = """
+    SELECT ID, PATIENT_NAME, GENDER, AGE, VISIT_DATE, DEPARTMENT, DIAGNOSIS, DOCTOR
+    FROM OUTPATIENT_RECORDS
+    ORDER BY ID
+"""
+
+
+def build_database(db_path, row_count, seed=42):
+    """生成固定随机种子的 OUTPATIENT_RECORDS 测试库，已存在且行数一致时直接复用"""
+    if os.path.exists(db_path):
+        connection = sqlite3.connect(db_path)
+        try:
+            if connection.execute("SELECT COUNT(*) FROM OUTPATIENT_RECORDS").fetchone()[0] == row_count:
+                return db_path
+        except sqlite3.Error:
+            pass
+        finally:
+            connection.close()
+        os.remove(db_path)
+
+    print(f"生成 {row_count} 条测试数据: {db_path}")
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute("""
+            CREATE TABLE OUTPATIENT_RECORDS (
+                ID INTEGER PRIMARY KEY,
+                PATIENT_NAME TEXT,
+                GENDER TEXT,
+                AGE INTEGER,
+                VISIT_DATE DATE,
+                DEPARTMENT TEXT,
+                DIAGNOSIS TEXT,
+                DOCTOR TEXT
+            )
+        """)
+        rows = ((
+            i,
+            f"患者{rng.randint(1, 50000)}",
+            rng.choice(["男", "女"]),
+            rng.randint(1, 90),
+            (base + timedelta(minutes=rng.randint(0, 365 * 24 * 60))).isoformat(' '),
+            rng.choice(DEPARTMENTS),
+            rng.choice(DIAGNOSES),
+            rng.choice(DOCTORS)
+        ) for i in range(1, row_count + 1))
+        connection.executemany("INSERT INTO OUTPATIENT_RECORDS VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        connection.commit()
+    finally:
+        connection.close()
+    return db_path
+
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存（MB），无法获取时返回 None"""
+    if psutil is not None and hasattr(psutil.Process().memory_info(), 'peak_wset'):
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 以KB为单位，macOS 以字节为单位
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    return None
+
+
+def run_case(db_path, row_count, output_format, fetch_mode):
+    """在当前进程中执行一个测试用例，返回测量结果"""
+    import config
+    from database_extractor import DatabaseExtractor
+    from sqlite_adapter import connection_factory
+
+    output_dir = tempfile.mkdtemp(prefix='extract_bench_')
+    config.FILE_CONFIG['output_dir'] = output_dir
+    try:
+        extractor = DatabaseExtractor(use_cache=False, connection_factory=connection_factory(db_path))
+        query = {
+            'name': 'benchmark',
+            'sheet_name': '门诊明细',
+            'sql': BENCH_SQL,
+            'format': output_format,
+            'fetch_mode': fetch_mode
+        }
+
+        start = time.perf_counter()
+        files = extractor.extract_queries([query])
+        elapsed = time.perf_counter() - start
+        if not files:
+            raise RuntimeError("数据提取失败")
+
+        peak = peak_rss_mb()
+        return {
+            'rows': row_count,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(row_count / elapsed, 1),
+            'peak_rss_mb': round(peak, 1) if peak is not None else None,
+            'output_bytes': sum(os.path.getsize(path) for path in files),
+            'phases': extractor.metrics.to_record(True)['phases']
+        }
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def run_case_isolated(db_path, row_count, output_format, fetch_mode):
+    """在子进程中执行测试用例，使峰值内存只反映该用例"""
+    case = json.dumps([db_path, row_count, output_format, fetch_mode])
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--case', case],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8'
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "子进程异常退出")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """与基线比较，返回退化项列表"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result['rows_per_sec'] < base['rows_per_sec'] * (1 - threshold):
+            regressions.append(f"{key}: 行/秒 {result['rows_per_sec']:.0f} < 基线 {base['rows_per_sec']:.0f}")
+        if result['peak_rss_mb'] and base.get('peak_rss_mb') and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + threshold):
+            regressions.append(f"{key}: 峰值内存 {result['peak_rss_mb']:.0f}MB > 基线 {base['peak_rss_mb']:.0f}MB")
+        if result['output_bytes'] > base['output_bytes'] * (1 + threshold):
+            regressions.append(f"{key}: 输出大小 {result['output_bytes']} > 基线 {base['output_bytes']}")
+    return regressions
+
+
+def parse_args():
+    from report_writers import FORMAT_EXTENSIONS
+
+    parser = argparse.ArgumentParser(description="数据提取性能基准测试")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES), help="数据量，逗号分隔")
+    parser.add_argument('--formats', default=','.join(FORMAT_EXTENSIONS), help="输出格式，逗号分隔")
+    parser.add_argument('--modes', default=','.join(FETCH_MODES), help="读取模式（tuple/arrow），逗号分隔")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument('--save-baseline', action='store_true', help="将本次结果写入基线文件")
+    parser.add_argument('--threshold', type=float, default=0.2, help="允许的退化比例，默认 0.2")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'extract_bench_data'), help="测试库目录，可跨次复用")
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # 子进程：执行单个用例，最后一行输出JSON结果
+    if args.case:
+        print(json.dumps(run_case(*json.loads(args.case))))
+        return 0
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    formats = args.formats.split(',')
+    modes = args.modes.split(',')
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    results = {}
+    for row_count in sizes:
+        db_path = build_database(os.path.join(args.data_dir, f"outpatient_{row_count}.db"), row_count)
+        for output_format in formats:
+            for fetch_mode in modes:
+                key = f"{row_count}/{output_format}/{fetch_mode}"
+                print(f"运行 {key} ...", flush=True)
+                results[key] = run_case_isolated(db_path, row_count, output_format, fetch_mode)
+
+    print("=" * 72)
+    print(f"{'用例':<28}{'耗时(秒)':>10}{'行/秒':>12}{'峰值内存(MB)':>14}{'输出(KB)':>10}")
+    for key, result in results.items():
+        rss = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else '-'
+        print(f"{key:<28}{result['seconds']:>10.2f}{result['rows_per_sec']:>12.0f}{rss:>14}{result['output_bytes'] / 1024:>10.0f}")
+    print("=" * 72)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"未找到基线文件 {args.baseline}，使用 --save-baseline 生成")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"性能退化超过 {args.threshold:.0%}:")
+        for item in regressions:
+            print(f"  {item}")
+        return 1
+
+    print(f"与基线相比无超过 {args.threshold:.0%} 的退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
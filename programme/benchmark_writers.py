@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+报表写入性能对比脚本
+比较 pandas + 回读列宽 的原Excel写入路径与各流式写入器（xlsx/CSV/gzip CSV/Parquet，
+行元组批次与Arrow批次）的耗时和文件大小
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+import config
+from database_extractor import DatabaseExtractor
+from report_writers import FORMAT_EXTENSIONS, create_writer, rows_to_table
+
+COLUMNS = ["ID", "PATIENT_NAME", "GENDER", "AGE", "VISIT_DATE", "DEPARTMENT", "DIAGNOSIS", "DOCTOR"]
+DEPARTMENTS = ["内科", "外科", "儿科", "妇科", "骨科"]
+DIAGNOSES = ["感冒", "高血压", "糖尿病", "骨折", "胃炎", "头痛"]
+
+
+def generate_rows(row_count):
+    """生成与 OUTPATIENT_RECORDS 结构一致的测试数据"""
+    # VISIT_DATE 对应Oracle DATE，只精确到秒
+    base = datetime.now().replace(microsecond=0)
+    return [(
+        i,
+        f"患者{i % 5000}",
+        random.choice(["男", "女"]),
+        random.randint(1, 90),
+        base - timedelta(days=random.randint(0, 365)),
+        random.choice(DEPARTMENTS),
+        random.choice(DIAGNOSES),
+        f"医生{chr(65 + i % 10)}"
+    ) for i in range(1, row_count + 1)]
+
+
+def batched(rows, size):
+    """将数据按批次切分，模拟 fetchmany"""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    output_dir = tempfile.mkdtemp(prefix='writer_bench_')
+    config.FILE_CONFIG['output_dir'] = output_dir
+
+    try:
+        print(f"生成 {row_count} 条测试数据...")
+        rows = generate_rows(row_count)
+        # 不使用查询缓存和内容指纹，每次都实际写入文件
+        extractor = DatabaseExtractor(use_cache=False)
+        extractor.fingerprint_store = None
+
+        batch_size = config.QUERY_CONFIG.get('fetch_arraysize', 5000)
+        results = []
+
+        start = time.perf_counter()
+        filepath = extractor.save_to_excel(COLUMNS, rows)
+        results.append(("xlsx(pandas + 回读列宽)", time.perf_counter() - start, os.path.getsize(filepath)))
+
+        for output_format, extension in FORMAT_EXTENSIONS.items():
+            filepath = os.path.join(output_dir, f"bench_{output_format.replace('.', '_')}{extension}")
+            start = time.perf_counter()
+            writer = create_writer(output_format, filepath)
+            sheet = writer.add_sheet('数据报表', COLUMNS)
+            for batch in batched(rows, batch_size):
+                sheet.write_rows(batch)
+            writer.save()
+            results.append((f"{output_format}(流式)", time.perf_counter() - start, os.path.getsize(filepath)))
+
+        # 列式路径：批次以Arrow表到达（对应 fetch_mode='arrow'）
+        tables = [rows_to_table(COLUMNS, batch) for batch in batched(rows, batch_size)]
+        for output_format, extension in FORMAT_EXTENSIONS.items():
+            filepath = os.path.join(output_dir, f"bench_arrow_{output_format.replace('.', '_')}{extension}")
+            start = time.perf_counter()
+            writer = create_writer(output_format, filepath)
+            sheet = writer.add_sheet('数据报表', COLUMNS)
+            for table in tables:
+                sheet.write_arrow(table)
+            writer.save()
+            results.append((f"{output_format}(Arrow批次)", time.perf_counter() - start, os.path.getsize(filepath)))
+
+        baseline = results[0][1]
+        print("=" * 60)
+        print(f"{'写入路径':<24}{'耗时(秒)':>10}{'相对原路径':>12}{'文件大小(KB)':>14}")
+        for name, seconds, size in results:
+            print(f"{name:<24}{seconds:>10.2f}{seconds / baseline:>11.0%}{size / 1024:>14.0f}")
+        print("=" * 60)
+
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
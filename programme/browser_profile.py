@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器配置模块
+按 BROWSER_CONFIG 创建Chrome浏览器：lean 配置无头运行、屏蔽图片/字体/样式表、
+禁用扩展并采用 eager 页面加载策略，启动更快、内存占用更小；full 配置为有界面的完整浏览器，便于调试
+"""
+
+import logging
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from config import BROWSER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def build_chrome_options(profile=None):
+    """按配置生成Chrome启动选项"""
+    profile = profile or BROWSER_CONFIG.get('profile', 'lean')
+
+    chrome_options = Options()
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument(f"--window-size={BROWSER_CONFIG.get('window_size', '1920,1080')}")
+
+    if profile == 'lean':
+        chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        # 2 表示阻止加载图片；字体和样式表由 block_resources 通过CDP拦截
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        # DOMContentLoaded 后即返回，不等待剩余资源
+        chrome_options.page_load_strategy = 'eager'
+
+    return chrome_options
+
+
+def block_resources(driver):
+    """通过CDP拦截图片、字体和样式表请求（Chrome偏好设置无法屏蔽样式表）"""
+    patterns = BROWSER_CONFIG.get('blocked_url_patterns', [])
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        logger.info(f"已屏蔽 {len(patterns)} 类资源请求")
+    except Exception as e:
+        # 屏蔽失败不影响发送，只是页面加载较慢
+        logger.warning(f"资源请求屏蔽失败: {str(e)}")
+
+
+def create_driver(profile=None):
+    """创建Chrome浏览器驱动"""
+    profile = profile or BROWSER_CONFIG.get('profile', 'lean')
+
+    # 自动下载并设置ChromeDriver
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(profile))
+
+    if profile == 'lean':
+        block_resources(driver)
+    logger.info(f"Chrome浏览器已启动（{profile} 配置）")
+    return driver
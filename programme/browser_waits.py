@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器等待模块
+以显式条件（URL跳转、元素出现、结果提示）代替固定 sleep，
+各步骤按 WAIT_CONFIG 设置超时和轮询间隔，并记录每次等待的实际耗时
+"""
+
+import time
+import logging
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from config import WAIT_CONFIG
+
+
+def document_ready(driver):
+    """页面文档已解析完成（eager 加载策略下不等待图片等资源）"""
+    return driver.execute_script("return document.readyState") in ("interactive", "complete")
+
+
+def url_contains_any(*fragments):
+    """当前URL包含任一片段"""
+    def condition(driver):
+        url = driver.current_url
+        return any(fragment in url for fragment in fragments)
+    return condition
+
+
+class PageWaiter:
+    """按步骤等待页面条件满足
+
+    每个步骤使用 WAIT_CONFIG['timeouts'] 中的超时时间，条件满足立即返回，
+    超时时抛出 TimeoutException。
+    """
+
+    def __init__(self, driver, timeouts=None, poll_interval=None):
+        self.driver = driver
+        self.timeouts = dict(WAIT_CONFIG['timeouts'])
+        self.timeouts.update(timeouts or {})
+        self.poll_interval = poll_interval or WAIT_CONFIG.get('poll_interval', 0.2)
+        self.logger = logging.getLogger(__name__)
+
+    def timeout(self, step):
+        """步骤的超时时间（秒）"""
+        return self.timeouts.get(step, self.timeouts['default'])
+
+    def until(self, step, condition, description=''):
+        """等待 condition 返回真值并返回该值，记录实际等待时间"""
+        timeout = self.timeout(step)
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval).until(condition)
+        except TimeoutException:
+            elapsed = time.perf_counter() - start
+            self.logger.error(f"等待超时 [{step}] {description}，已等待 {elapsed:.2f} 秒（上限 {timeout} 秒）")
+            raise
+        elapsed = time.perf_counter() - start
+        self.logger.info(f"等待完成 [{step}] {description}，用时 {elapsed:.2f} 秒")
+        return result
+
+    def element(self, step, locator, clickable=False):
+        """等待元素出现（clickable 为真时等待元素可点击）并返回该元素"""
+        condition = EC.element_to_be_clickable(locator) if clickable else EC.presence_of_element_located(locator)
+        return self.until(step, condition, f"元素 {locator[1]}")
+
+    def page_ready(self, step='page_load'):
+        """等待页面文档加载完成"""
+        return self.until(step, document_ready, "页面加载")
@@ -1,71 +1,232 @@
-# -*- coding: utf-8 -*-
-"""
-配置文件
-包含数据库连接参数、邮件发送配置等
-"""
-
-import os
-from datetime import datetime
-
-# 数据库配置
-DATABASE_CONFIG = {
-    'host': 'localhost',         # 必须是 localhost 或 127.0.0.1
-    'port': 1521,
-    'service_name': 'orcl',     # 已注册的实例
-    'username': 'system',
-    'password': 'root',
-    'encoding': 'UTF-8'
-}
-
-# 邮件配置
-EMAIL_CONFIG = {
-    'oa_url': 'http://localhost:5000',  # 本地OA系统地址
-    'username': 'admin',                # 邮箱用户名
-    'password': 'admin123',             # 邮箱密码
-    'recipients': ['user1', 'user2'],   # 收件人列表
-    'subject_prefix': '数据报表',        # 邮件主题前缀
-}
-
-# 文件配置
-FILE_CONFIG = {
-    'output_dir': 'D:\\data_reports',  # 输出目录
-    'file_prefix': '数据报表',         # 文件前缀
-    'file_extension': '.xlsx'          # 文件扩展名
-}
-
-# 查询配置
-QUERY_CONFIG = {
-    'sql_query': '''
-        SELECT 
-            column1,
-            column2,
-            column3,
-            TO_CHAR(SYSDATE, 'YYYY-MM-DD') as report_date
-        FROM your_table_name
-        WHERE condition = 'your_condition'
-        ORDER BY column1
-    ''',  # 需要执行的SQL查询
-    'sheet_name': '数据报表'  # Excel工作表名称
-}
-
-# 时间配置
-TIME_CONFIG = {
-    'schedule_time': '09:00',  # 每日执行时间
-    'timezone': 'Asia/Shanghai'  # 时区
-}
-
-def get_filename():
-    """生成带时间戳的文件名"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    return f"{FILE_CONFIG['file_prefix']}_{timestamp}{FILE_CONFIG['file_extension']}"
-
-def get_filepath():
-    """获取完整的文件路径"""
-    filename = get_filename()
-    return os.path.join(FILE_CONFIG['output_dir'], filename)
-
-def ensure_output_dir():
-    """确保输出目录存在"""
-    if not os.path.exists(FILE_CONFIG['output_dir']):
-        os.makedirs(FILE_CONFIG['output_dir'])
+# -*- coding: utf-8 -*-
+"""
+配置文件
+包含数据库连接参数、邮件发送配置等
+"""
+
+import os
+from datetime import datetime
+
+# 数据库配置
+DATABASE_CONFIG = {
+    'host': 'localhost',         # 必须是 localhost 或 127.0.0.1
+    'port': 1521,
+    'service_name': 'orcl',     # 已注册的实例
+    'username': 'system',
+    'password': 'root',
+    'encoding': 'UTF-8',
+    'pool_min': 1,               # 连接池最小连接数
+    'pool_max': 4,               # 连接池最大连接数
+    'pool_increment': 1,         # 连接池每次扩容的连接数
+    'pool_ping_interval': 60,    # 空闲连接被取出前的存活检测间隔（秒）
+    'stmtcachesize': 50          # 每个连接的语句缓存大小
+}
+
+# 邮件配置
+EMAIL_CONFIG = {
+    'oa_url': 'http://localhost:5000',  # 本地OA系统地址
+    'username': 'admin',                # 邮箱用户名
+    'password': 'admin123',             # 邮箱密码
+    'recipients': ['user1', 'user2'],   # 收件人列表
+    'subject_prefix': '数据报表',        # 邮件主题前缀
+    'cookie_path': 'D:\\data_reports\\oa_session\\cookies.json',  # 登录会话Cookie，下次启动时复用以跳过登录；为空时不保存
+    'persistent_session': False,        # 为真时发送后保持浏览器打开，同一进程内的后续发送复用已登录的会话
+    'delivery_report_path': 'D:\\data_reports\\delivery\\deliveries.jsonl',  # 逐收件人投递记录（每封邮件一行），为空时只写日志
+    'transport': 'selenium'             # selenium：浏览器自动化（默认）；http：直接提交OA表单（HttpEmailSender，需确认OA表单不依赖页面脚本后再启用）
+}
+
+# 浏览器配置：lean 无头运行并屏蔽图片/字体/样式表，适合在共用的自动化主机上运行；
+# full 为有界面的完整浏览器，便于排查页面问题
+BROWSER_CONFIG = {
+    'profile': 'lean',
+    'window_size': '1920,1080',
+    'blocked_url_patterns': [   # lean 配置下通过CDP拦截的请求
+        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.ico', '*.webp',
+        '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+        '*.css'
+    ]
+}
+
+# 浏览器等待配置：各步骤等待页面条件满足（URL跳转、元素出现、发送结果提示）的超时时间
+WAIT_CONFIG = {
+    'poll_interval': 0.2,   # 条件检查的轮询间隔（秒）
+    'timeouts': {           # 各步骤超时时间（秒），未列出的步骤使用 default
+        'default': 20,
+        'page_load': 15,    # 打开页面后等待表单出现
+        'login': 15,        # 点击登录后等待跳转
+        'navigate': 10,     # 进入写邮件页面
+        'send': 30          # 点击发送后等待结果提示（含附件上传）
+    }
+}
+
+# 文件配置
+FILE_CONFIG = {
+    'output_dir': 'D:\\data_reports',  # 输出目录
+    'file_prefix': '数据报表',         # 文件前缀
+    'file_extension': '.xlsx',         # 文件扩展名
+    'width_sample_rows': 1000,         # 流式写入时用于计算列宽的前导行数
+    'excel_max_rows': 1048575,         # 单张工作表的数据行上限（Excel上限1048576行含表头）
+    'excel_rollover': 'sheet',         # 超过上限时续写方式：sheet（同一文件续开工作表）或 file（续写到新文件）
+    'row_store_dir': 'D:\\data_reports\\row_store'  # 增量提取的本地行存储目录
+}
+
+# 查询配置
+QUERY_CONFIG = {
+    'sql_query': '''
+        SELECT 
+            column1,
+            column2,
+            column3,
+            TO_CHAR(SYSDATE, 'YYYY-MM-DD') as report_date
+        FROM your_table_name
+        WHERE condition = 'your_condition'
+        ORDER BY column1
+    ''',  # 需要执行的SQL查询
+    'sheet_name': '数据报表',  # Excel工作表名称
+    'streaming': True,          # 流式提取：分批读取并直接写入文件，内存占用不随结果集增长
+    'fetch_arraysize': 5000,    # 每批从游标读取的行数（cursor.arraysize）
+    'fetch_prefetchrows': 5001, # 执行查询时随首次往返预取的行数（cursor.prefetchrows）
+    'fetch_mode': 'tuple',      # 读取方式：tuple（逐行元组）或 arrow（oracledb列式批次，可被单个查询覆盖）
+    'max_workers': 3,           # 多个报表查询并发执行的线程数（不应超过连接池 pool_max）
+    'async_mode': False,        # 使用asyncio提取（AsyncDatabaseExtractor，仅支持oracledb Thin模式）
+    # 绑定变量默认值，SQL中以 :名称 引用，可用命令行 --param 名称[:类型]=值 覆盖；
+    # 运行时还会自动提供 report_date（当天零点）
+    'params': {},
+    # 每日报表包含的查询，每个查询写入同一工作簿的独立工作表；留空则只执行上面的 sql_query
+    'queries': [
+        {
+            'name': 'outpatient_detail',
+            'sheet_name': '门诊明细',
+            # 增量提取：按该列记录高水位线，每次只拉取新增行（仅适用于只追加的表）
+            'incremental_column': 'ID',
+            # 输出格式：xlsx（写入共用工作簿）、csv、csv.gz 或 parquet（单独输出文件）
+            'format': 'xlsx',
+            # 分区并行：非增量模式下按 partition_column 切分为 parallel_degree 个区间并发拉取；
+            # 合并结果按 partition_column 升序排列，查询的 ORDER BY 为其他列时不分区执行
+            'parallel_degree': 1,
+            'partition_column': 'ID',
+            'sql': '''
+                SELECT ID, PATIENT_NAME, GENDER, AGE, VISIT_DATE, DEPARTMENT, DIAGNOSIS, DOCTOR
+                FROM OUTPATIENT_RECORDS
+                ORDER BY ID
+            '''
+        },
+        {
+            'name': 'department_summary',
+            'sheet_name': '科室汇总',
+            'sql': '''
+                SELECT DEPARTMENT, COUNT(*) AS VISIT_COUNT, ROUND(AVG(AGE), 1) AS AVG_AGE
+                FROM OUTPATIENT_RECORDS
+                GROUP BY DEPARTMENT
+                ORDER BY DEPARTMENT
+            '''
+        },
+        {
+            'name': 'doctor_workload',
+            'sheet_name': '医生工作量',
+            'sql': '''
+                SELECT DOCTOR, DEPARTMENT, COUNT(*) AS VISIT_COUNT
+                FROM OUTPATIENT_RECORDS
+                GROUP BY DOCTOR, DEPARTMENT
+                ORDER BY VISIT_COUNT DESC
+            '''
+        }
+    ]
+}
+
+# 分类汇总配置：对 source 按各维度分别计数，生成一条 GROUP BY GROUPING SETS 查询，
+# 只有汇总结果经网络返回，写入单独的工作表
+SUMMARY_CONFIG = {
+    'enabled': True,
+    'name': 'summary',
+    'sheet_name': '分类汇总',
+    'source': 'OUTPATIENT_RECORDS',   # 表名或子查询
+    'where': None,                    # 可选过滤条件，可引用绑定变量，如 "VISIT_DATE >= :start_date"
+    'dimensions': [                   # 汇总维度：列名及其在表中的显示名称
+        {'column': 'DEPARTMENT', 'label': '科室'},
+        {'column': 'DOCTOR', 'label': '医生'},
+        {'column': 'DIAGNOSIS', 'label': '诊断'}
+    ],
+    'include_total': True             # 是否包含总计行
+}
+
+# 查询结果缓存配置
+CACHE_CONFIG = {
+    'enabled': True,                              # 是否启用查询结果缓存（命令行 --no-cache 可临时关闭）
+    'cache_dir': 'D:\\data_reports\\query_cache',  # 缓存目录
+    'ttl_seconds': 1800,                          # 缓存有效期（秒）
+    'max_bytes': 500 * 1024 * 1024                # 缓存目录总大小上限（字节）
+}
+
+# 本地分析副本配置：定期将源表增量批量复制到本地SQLite数据库（python local_replica.py），
+# 启用后报表查询在副本上执行，不再直接查询生产库
+REPLICA_CONFIG = {
+    'enabled': False,
+    'db_path': 'D:\\data_reports\\replica\\his_replica.db',
+    'batch_size': 10000,            # 每次从Oracle读取并写入副本的行数
+    'sync_interval_minutes': 60,    # 计划任务中副本同步的间隔
+    'max_age_minutes': 1440,        # 报表运行时副本超过该时长未同步则先同步
+    'tables': [
+        {
+            'name': 'OUTPATIENT_RECORDS',
+            'key_column': 'ID',             # 主键，副本中按主键覆盖写入
+            'incremental_column': 'ID'      # 增量列；源表行会被修改时应改为更新时间列
+        }
+    ]
+}
+
+# 报表内容指纹配置：查询结果与上次成功发送时相同则不生成报表文件
+FINGERPRINT_CONFIG = {
+    'enabled': True,
+    'state_path': 'D:\\data_reports\\fingerprint.json',  # 上次成功发送的内容指纹
+    'unchanged_action': 'notice'                          # 内容未变化时：skip（不发送）或 notice（发送无附件的提示邮件）
+}
+
+# 运行指标配置：每次运行追加一行JSON记录，并覆盖写出Prometheus textfile collector指标文件
+METRICS_CONFIG = {
+    'enabled': True,
+    'json_path': 'D:\\data_reports\\metrics\\runs.jsonl',                # 运行记录（每行一次运行）
+    'prometheus_path': 'D:\\data_reports\\metrics\\report_pipeline.prom'  # 为空时不输出Prometheus指标
+}
+
+# 时间配置
+TIME_CONFIG = {
+    'schedule_time': '09:00',  # 每日执行时间
+    'timezone': 'Asia/Shanghai'  # 时区
+}
+
+def get_filename(name=None, extension=None):
+    """生成带时间戳的文件名，name 用于区分同一次运行输出的多个文件"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    extension = extension or FILE_CONFIG['file_extension']
+    if name:
+        return f"{FILE_CONFIG['file_prefix']}_{name}_{timestamp}{extension}"
+    return f"{FILE_CONFIG['file_prefix']}_{timestamp}{extension}"
+
+def get_filepath(name=None, extension=None):
+    """获取完整的文件路径"""
+    filename = get_filename(name, extension)
+    return os.path.join(FILE_CONFIG['output_dir'], filename)
+
+def get_report_queries():
+    """获取本次运行的报表查询列表，未配置 queries 时退化为单个 sql_query"""
+    if QUERY_CONFIG.get('queries'):
+        return QUERY_CONFIG['queries']
+    return [{
+        'name': 'default',
+        'sheet_name': QUERY_CONFIG['sheet_name'],
+        'sql': QUERY_CONFIG['sql_query']
+    }]
+
+def get_run_params(overrides=None):
+    """获取报表查询可用的绑定变量：运行上下文、配置默认值、命令行覆盖依次叠加"""
+    params = {'report_date': datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)}
+    params.update(QUERY_CONFIG.get('params', {}))
+    params.update(overrides or {})
+    return params
+
+def ensure_output_dir():
+    """确保输出目录存在"""
+    if not os.path.exists(FILE_CONFIG['output_dir']):
+        os.makedirs(FILE_CONFIG['output_dir'])
         print(f"创建输出目录: {FILE_CONFIG['output_dir']}") 
\ No newline at end of file
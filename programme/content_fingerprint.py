@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+报表内容指纹模块
+在读取查询结果时流式计算内容哈希，与上次成功发送的指纹比较，
+内容未变化时丢弃已写出的报表文件（xlsx先暂存，不写入工作簿）
+"""
+
+import os
+import json
+import array
+import pickle
+import hashlib
+import logging
+from decimal import Decimal
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+import pyarrow as pa
+import pyarrow.compute as pc
+from report_writers import rows_to_table
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def array_values(array, width):
+    """定长类型数组的值缓冲区（考虑切片偏移）"""
+    return array.buffers()[1][array.offset * width:(array.offset + len(array)) * width]
+
+
+def text_values(array):
+    """文本/二进制数组（不含空值）的各值字节长度（int32）和拼接后的内容"""
+    width = 8 if pa.types.is_large_string(array.type) or pa.types.is_large_binary(array.type) else 4
+    offsets = array.buffers()[1]
+    first = int.from_bytes(offsets[array.offset * width:(array.offset + 1) * width], 'little', signed=True)
+    last = int.from_bytes(offsets[(array.offset + len(array)) * width:(array.offset + len(array) + 1) * width], 'little', signed=True)
+    lengths = pc.binary_length(array).cast(pa.int32())
+    return array_values(lengths, 4), array.buffers()[2][first:last]
+
+
+def microseconds(value):
+    """日期时间转换为微秒时间戳，带时区的按UTC计算，日期按当天零点"""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+class ContentHasher:
+    """按列流式计算查询结果的内容哈希
+
+    每列按值的类别分别累计：数值统一为 float64，日期时间统一为微秒时间戳，
+    文本为UTF-8字节长度和内容，空值位置单独记录。行元组批次逐值转换，Arrow批次按列转换，
+    两种读取方式（tuple/arrow）和任意批次切分得到相同的哈希。
+    """
+
+    def __init__(self):
+        self.columns = None
+        self.streams = None
+
+    def set_columns(self, columns):
+        self.columns = list(columns)
+        self.streams = [defaultdict(hashlib.sha256) for _ in self.columns]
+
+    def update_rows(self, rows):
+        """累计一批行元组，先按列转换为Arrow数组；同一列混有无法统一类型的值时逐值转换"""
+        try:
+            table = rows_to_table(self.columns, rows)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            self.update_values(rows)
+            return
+        self.update_arrow(table)
+
+    def update_values(self, rows):
+        """逐值累计一批行元组"""
+        for index, streams in enumerate(self.streams):
+            nulls = bytearray()
+            numbers = array.array('d')
+            times = array.array('q')
+            texts = []
+            for row in rows:
+                value = row[index]
+                nulls.append(value is None)
+                if value is None:
+                    continue
+                if isinstance(value, (bool, int, float, Decimal)):
+                    numbers.append(float(value))
+                elif isinstance(value, date):
+                    times.append(microseconds(value))
+                elif isinstance(value, (bytes, bytearray, memoryview)):
+                    texts.append(bytes(value))
+                else:
+                    texts.append(str(value).encode('utf-8'))
+            streams['null'].update(nulls)
+            if numbers:
+                streams['number'].update(numbers.tobytes())
+            if times:
+                streams['time'].update(times.tobytes())
+            if texts:
+                streams['text_length'].update(array.array('i', map(len, texts)).tobytes())
+                streams['text'].update(b''.join(texts))
+
+    def update_arrow(self, table):
+        """累计一个Arrow批次，各列先转换为规范类型再按缓冲区计算"""
+        for column, streams in zip(table.columns, self.streams):
+            for chunk in column.chunks:
+                streams['null'].update(array_values(pc.is_null(chunk).cast(pa.uint8()), 1))
+                values = chunk.drop_null()
+                if len(values) == 0:
+                    continue
+                value_type = values.type
+                if pa.types.is_integer(value_type) or pa.types.is_floating(value_type) \
+                        or pa.types.is_decimal(value_type) or pa.types.is_boolean(value_type):
+                    streams['number'].update(array_values(values.cast(pa.float64(), safe=False), 8))
+                elif pa.types.is_timestamp(value_type) or pa.types.is_date(value_type):
+                    # 时间戳内部值即为UTC微秒数，带时区时保留时区只换算单位
+                    unit = pa.timestamp('us', tz=value_type.tz) if pa.types.is_timestamp(value_type) else pa.timestamp('us')
+                    stamps = values.cast(unit, safe=False).cast(pa.int64())
+                    streams['time'].update(array_values(stamps, 8))
+                else:
+                    if not (pa.types.is_string(value_type) or pa.types.is_large_string(value_type)
+                            or pa.types.is_binary(value_type) or pa.types.is_large_binary(value_type)):
+                        values = values.cast(pa.string())
+                    lengths, data = text_values(values)
+                    streams['text_length'].update(lengths)
+                    streams['text'].update(data)
+
+    def hexdigest(self):
+        digest = hashlib.sha256()
+        digest.update(json.dumps(self.columns, ensure_ascii=False).encode('utf-8'))
+        for streams in self.streams or []:
+            digest.update(json.dumps({name: stream.hexdigest() for name, stream in sorted(streams.items())}).encode('utf-8'))
+        return digest.hexdigest()
+
+
+class HashingSheet:
+    """写入报表工作表的同时计算内容哈希，接口与写入器的工作表一致
+
+    用于可廉价丢弃的写入器（CSV、Parquet）：内容未变化时直接丢弃已写出的文件。
+    """
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.hasher = ContentHasher()
+
+    @property
+    def row_count(self):
+        return self.sheet.row_count
+
+    def set_columns(self, columns, schema=None):
+        self.hasher.set_columns(columns)
+        self.sheet.set_columns(columns, schema)
+
+    def write_rows(self, rows):
+        self.hasher.update_rows(rows)
+        self.sheet.write_rows(rows)
+
+    def write_arrow(self, table):
+        self.hasher.update_arrow(table)
+        self.sheet.write_arrow(table)
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+
+class SpoolSheet:
+    """暂存一个报表查询的结果并计算内容哈希，接口与写入器的工作表一致
+
+    用于写入成本高的xlsx：先暂存到本地，内容有变化时再由暂存数据写入工作簿。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = None
+        self.schema = None
+        self.row_count = 0
+        self.hasher = ContentHasher()
+        self.stream = open(path, 'wb')
+
+    def set_columns(self, columns, schema=None):
+        self.columns = list(columns)
+        self.schema = schema
+        self.hasher.set_columns(columns)
+
+    def write_rows(self, rows):
+        pickle.dump(rows, self.stream, protocol=pickle.HIGHEST_PROTOCOL)
+        self.hasher.update_rows(rows)
+        self.row_count += len(rows)
+
+    def write_arrow(self, table):
+        pickle.dump(table, self.stream, protocol=pickle.HIGHEST_PROTOCOL)
+        self.hasher.update_arrow(table)
+        self.row_count += table.num_rows
+
+    def close(self):
+        self.stream.close()
+
+    def read_batches(self):
+        """逐批读出暂存的数据（行元组列表或Arrow表）"""
+        with open(self.path, 'rb') as stream:
+            while True:
+                try:
+                    yield pickle.load(stream)
+                except EOFError:
+                    break
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+
+def combine_fingerprint(queries, sheets):
+    """按查询顺序合并各查询的内容哈希，得到本次运行的内容指纹"""
+    digest = hashlib.sha256()
+    for query, sheet in zip(queries, sheets):
+        digest.update(f"{query['name']}:{sheet.hexdigest()}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class FingerprintStore:
+    """保存上次成功发送的报表内容指纹"""
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.logger = logging.getLogger(__name__)
+
+    def load(self):
+        """读取上次的指纹，没有记录时返回 None"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('fingerprint')
+        except (OSError, ValueError):
+            return None
+
+    def save(self, fingerprint, files=None):
+        """原子地写入指纹"""
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fingerprint': fingerprint,
+                'updated_at': datetime.now().isoformat(),
+                'files': [os.path.basename(path) for path in files or []]
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, self.state_path)
+        self.logger.info(f"报表内容指纹已更新: {fingerprint[:12]}")
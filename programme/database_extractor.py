@@ -1,201 +1,818 @@
-# -*- coding: utf-8 -*-
-"""
-数据库数据提取模块
-从Oracle数据库提取数据并保存为Excel文件
-"""
-
-import oracledb
-import pandas as pd
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
-import logging
-from datetime import datetime
-from config import DATABASE_CONFIG, QUERY_CONFIG, get_filepath, ensure_output_dir
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('database_extractor.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-class DatabaseExtractor:
-    """数据库数据提取器"""
-    
-    def __init__(self):
-        self.connection = None
-        self.logger = logging.getLogger(__name__)
-        
-    def connect_database(self):
-        """连接Oracle数据库"""
-        try:
-            # 构建连接字符串
-            dsn = oracledb.makedsn(
-                DATABASE_CONFIG['host'],
-                DATABASE_CONFIG['port'],
-                service_name=DATABASE_CONFIG['service_name']
-            )
-            
-            # 建立连接
-            self.connection = oracledb.connect(
-                user=DATABASE_CONFIG['username'],
-                password=DATABASE_CONFIG['password'],
-                dsn=dsn,
-                encoding=DATABASE_CONFIG['encoding']
-            )
-            
-            self.logger.info("数据库连接成功")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"数据库连接失败: {str(e)}")
-            return False
-    
-    def execute_query(self):
-        """执行SQL查询并返回结果"""
-        try:
-            if not self.connection:
-                self.logger.error("数据库未连接")
-                return None
-                
-            cursor = self.connection.cursor()
-            cursor.execute(QUERY_CONFIG['sql_query'])
-            
-            # 获取列名
-            columns = [col[0] for col in cursor.description]
-            
-            # 获取数据
-            rows = cursor.fetchall()
-            
-            cursor.close()
-            
-            self.logger.info(f"查询执行成功，获取到 {len(rows)} 条记录")
-            return columns, rows
-            
-        except Exception as e:
-            self.logger.error(f"查询执行失败: {str(e)}")
-            return None
-    
-    def save_to_excel(self, columns, rows):
-        """将数据保存为Excel文件"""
-        try:
-            # 确保输出目录存在
-            ensure_output_dir()
-            
-            # 获取文件路径
-            filepath = get_filepath()
-            
-            # 创建DataFrame
-            df = pd.DataFrame(rows, columns=columns)
-            
-            # 保存为Excel文件
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=QUERY_CONFIG['sheet_name'], index=False)
-                
-                # 获取工作表对象
-                worksheet = writer.sheets[QUERY_CONFIG['sheet_name']]
-                
-                # 设置列宽
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-                
-                # 设置表头样式
-                header_font = Font(bold=True, color="FFFFFF")
-                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                header_alignment = Alignment(horizontal="center", vertical="center")
-                
-                for cell in worksheet[1]:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-            
-            self.logger.info(f"数据已保存到: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            self.logger.error(f"保存Excel文件失败: {str(e)}")
-            return None
-    
-    def extract_and_save(self):
-        """执行完整的数据提取和保存流程"""
-        try:
-            self.logger.info("开始数据提取流程")
-            
-            # 连接数据库
-            if not self.connect_database():
-                return None
-            
-            # 执行查询
-            result = self.execute_query()
-            if not result:
-                return None
-            
-            columns, rows = result
-            
-            # 保存到Excel
-            filepath = self.save_to_excel(columns, rows)
-            
-            return filepath
-            
-        except Exception as e:
-            self.logger.error(f"数据提取流程失败: {str(e)}")
-            return None
-        
-        finally:
-            # 关闭数据库连接
-            if self.connection:
-                self.connection.close()
-                self.logger.info("数据库连接已关闭")
-    
-    def test_connection(self):
-        """测试数据库连接"""
-        try:
-            if self.connect_database():
-                cursor = self.connection.cursor()
-                cursor.execute("SELECT 1 FROM DUAL")
-                result = cursor.fetchone()
-                cursor.close()
-                self.connection.close()
-                
-                if result:
-                    self.logger.info("数据库连接测试成功")
-                    return True
-                    
-        except Exception as e:
-            self.logger.error(f"数据库连接测试失败: {str(e)}")
-            
-        return False
-
-def main():
-    """主函数 - 用于测试"""
-    extractor = DatabaseExtractor()
-    
-    # 测试连接
-    if extractor.test_connection():
-        print("数据库连接测试通过")
-        
-        # 执行数据提取
-        filepath = extractor.extract_and_save()
-        if filepath:
-            print(f"数据提取完成，文件保存在: {filepath}")
-        else:
-            print("数据提取失败")
-    else:
-        print("数据库连接测试失败")
-
-if __name__ == "__main__":
+# -*- coding: utf-8 -*-
+"""
+数据库数据提取模块
+从Oracle数据库提取数据并保存为Excel文件
+"""
+
+import pandas as pd
+import pyarrow as pa
+import openpyxl
+from openpyxl.styles import Font, Alignment, PatternFill
+import os
+import re
+import time
+import pickle
+import itertools
+import shutil
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from config import QUERY_CONFIG, FILE_CONFIG, CACHE_CONFIG, SUMMARY_CONFIG, FINGERPRINT_CONFIG, REPLICA_CONFIG, get_filepath, ensure_output_dir, get_report_queries, get_run_params
+from report_writers import EXCEL_MAX_ROWS, FORMAT_EXTENSIONS, arrow_schema, create_writer
+from db_pool import acquire_connection
+from sqlite_adapter import connection_factory as sqlite_connection_factory
+from row_store import RowStore, definition_key
+from query_cache import QueryCache
+from run_metrics import RunMetrics
+from content_fingerprint import SpoolSheet, HashingSheet, FingerprintStore, combine_fingerprint
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('database_extractor.log', encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+
+# SQL中的命名绑定变量（:name），匹配前先去掉字符串常量，避免误认 'HH24:MI' 之类的格式串
+BIND_PATTERN = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+# 查询最外层的 ORDER BY 子句（位于SQL末尾且其后没有右括号）
+TRAILING_ORDER_BY = re.compile(r"\bORDER\s+BY\s+([^()]+?)\s*$", re.IGNORECASE)
+
+class DatabaseExtractor:
+    """数据库数据提取器"""
+    
+    def __init__(self, use_cache=True, params=None, metrics=None, connection_factory=None):
+        self.connection = None
+        self.output_files = []
+        self.logger = logging.getLogger(__name__)
+        
+        # 获取数据库连接的函数，默认从Oracle连接池获取；启用本地副本时改为连接副本，
+        # 性能测试等场景可替换为其他DB-API连接
+        self.source = 'oracle'
+        if connection_factory is None and REPLICA_CONFIG.get('enabled'):
+            connection_factory = sqlite_connection_factory(REPLICA_CONFIG['db_path'])
+            self.source = 'replica'
+        self.connection_factory = connection_factory or acquire_connection
+        
+        # 分阶段耗时与行数、字节数指标，可由调用方传入以与发送阶段合并记录
+        self.metrics = metrics or RunMetrics('extract')
+        
+        # 报表内容指纹：unchanged 表示本次结果与上次成功发送的相同，未生成文件
+        self.fingerprint_store = None
+        if FINGERPRINT_CONFIG.get('enabled'):
+            self.fingerprint_store = FingerprintStore(FINGERPRINT_CONFIG['state_path'])
+        self.fingerprint = None
+        self.unchanged = False
+        
+        # 报表查询的绑定变量：运行上下文 + 配置默认值 + 命令行覆盖
+        self.params = get_run_params(params)
+        
+        # 查询结果缓存（--no-cache 时不启用）
+        self.cache = None
+        if use_cache and CACHE_CONFIG.get('enabled'):
+            self.cache = QueryCache(
+                CACHE_CONFIG['cache_dir'],
+                ttl_seconds=CACHE_CONFIG.get('ttl_seconds', 1800),
+                max_bytes=CACHE_CONFIG.get('max_bytes', 500 * 1024 * 1024)
+            )
+        
+    def connect_database(self):
+        """从连接池获取Oracle数据库连接"""
+        try:
+            # 从进程级连接池获取连接
+            self.connection = self.get_connection()
+            
+            self.logger.info("数据库连接成功")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"数据库连接失败: {str(e)}")
+            return False
+    
+    def get_connection(self):
+        """从连接池获取连接，等待时间计入 db_connect 阶段"""
+        with self.metrics.phase('db_connect'):
+            return self.connection_factory()
+    
+    def execute_query(self):
+        """执行SQL查询并返回结果"""
+        try:
+            if not self.connection:
+                self.logger.error("数据库未连接")
+                return None
+                
+            cursor = self.connection.cursor()
+            with self.metrics.phase('db_execute'):
+                cursor.execute(QUERY_CONFIG['sql_query'], self.bind_params(QUERY_CONFIG['sql_query']))
+            
+            # 获取列名
+            columns = [col[0] for col in cursor.description]
+            
+            # 获取数据
+            with self.metrics.phase('db_fetch'):
+                rows = cursor.fetchall()
+            self.metrics.count('rows_fetched', len(rows))
+            
+            cursor.close()
+            
+            self.logger.info(f"查询执行成功，获取到 {len(rows)} 条记录")
+            return columns, rows
+            
+        except Exception as e:
+            self.logger.error(f"查询执行失败: {str(e)}")
+            return None
+    
+    def iter_batches(self, cursor):
+        """按批次读取游标数据的生成器，读取完毕后关闭游标"""
+        total = 0
+        try:
+            while True:
+                with self.metrics.phase('db_fetch'):
+                    rows = cursor.fetchmany()
+                if not rows:
+                    break
+                total += len(rows)
+                self.metrics.count('rows_fetched', len(rows))
+                yield rows
+        finally:
+            cursor.close()
+            self.logger.info(f"流式读取完成，共 {total} 条记录")
+    
+    def bind_params(self, sql, extra=None):
+        """从运行参数中挑出SQL实际引用的绑定变量，多余的名称会导致Oracle报错"""
+        names = {name.lower() for name in BIND_PATTERN.findall(STRING_LITERAL.sub("''", sql))}
+        params = {name: value for name, value in self.params.items() if name.lower() in names}
+        params.update(extra or {})
+        return params or None
+    
+    def open_stream_cursor(self, connection, sql, params=None):
+        """在指定连接上执行SQL查询，返回已配置批量读取参数的游标"""
+        cursor = connection.cursor()
+        
+        # 每次往返读取的行数，决定了单批数据的内存占用
+        cursor.arraysize = QUERY_CONFIG.get('fetch_arraysize', 5000)
+        cursor.prefetchrows = QUERY_CONFIG.get('fetch_prefetchrows', cursor.arraysize + 1)
+        with self.metrics.phase('db_execute'):
+            cursor.execute(sql, params)
+        return cursor
+    
+    def create_excel_writer(self, filepath):
+        """按文件配置创建流式Excel写入器"""
+        return create_writer(
+            'xlsx',
+            filepath,
+            width_sample_rows=FILE_CONFIG.get('width_sample_rows', 1000),
+            max_rows=FILE_CONFIG.get('excel_max_rows', EXCEL_MAX_ROWS - 1),
+            rollover=FILE_CONFIG.get('excel_rollover', 'sheet')
+        )
+    
+    def fetch_incremental(self, connection, query):
+        """只拉取高水位线之后的新增行并追加到本地行存储，返回该存储"""
+        # 存储按SQL文本和绑定变量区分，参数不同的数据不会混在同一份报表中
+        key = definition_key(query['sql'], self.bind_params(query['sql']))
+        store = RowStore(FILE_CONFIG['row_store_dir'], query['name'], key)
+        column = query['incremental_column']
+        watermark = store.get_watermark()
+        
+        if watermark is None:
+            sql = f"SELECT * FROM ({query['sql']}) ORDER BY {column}"
+            params = self.bind_params(sql)
+            self.logger.info(f"报表查询 {query['name']} 首次增量提取，拉取全量数据")
+        else:
+            sql = f"SELECT * FROM ({query['sql']}) WHERE {column} > :watermark ORDER BY {column}"
+            params = self.bind_params(sql, {'watermark': watermark})
+            self.logger.info(f"报表查询 {query['name']} 增量提取，水位线 {column} > {watermark}")
+        
+        cursor = self.open_stream_cursor(connection, sql, params)
+        columns = [col[0] for col in cursor.description]
+        # 表结构取自游标描述，不由首批数据推断
+        store.append(columns, self.iter_batches(cursor), column, arrow_schema(cursor.description))
+        return store
+    
+    def partition_order_kept(self, query):
+        """分区合并后的顺序是否与原查询一致：原查询没有 ORDER BY，或只按分区列升序排序
+
+        各区间按分区列排序后依次合并，原查询按其他列排序（如按数量倒序）时分区执行会打乱顺序。
+        """
+        column = query.get('partition_column', 'ID')
+        match = TRAILING_ORDER_BY.search(STRING_LITERAL.sub("''", query['sql']))
+        if not match:
+            return True
+        order_by = re.sub(r"\s+ASC$", "", match.group(1).strip(), flags=re.IGNORECASE)
+        return order_by.split('.')[-1].upper() == column.upper()
+    
+    def partition_ranges(self, query):
+        """按分区列的最小/最大值把查询切分为 parallel_degree 个连续的键区间"""
+        column = query.get('partition_column', 'ID')
+        degree = query['parallel_degree']
+        
+        if not self.partition_order_kept(query):
+            self.logger.warning(f"报表查询 {query['name']} 的 ORDER BY 不是分区列 {column}，分区执行会打乱顺序，不分区执行")
+            return []
+        
+        connection = self.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM ({query['sql']})", self.bind_params(query['sql']))
+            low, high = cursor.fetchone()
+            cursor.close()
+        finally:
+            connection.close()
+        
+        if low is None:
+            return []
+        if not isinstance(low, int) or not isinstance(high, int):
+            self.logger.warning(f"分区列 {column} 不是整数类型，报表查询 {query['name']} 不分区执行")
+            return []
+        
+        step = (high - low) // degree + 1
+        return [
+            (low + index * step, min(low + (index + 1) * step - 1, high))
+            for index in range(degree)
+            if low + index * step <= high
+        ]
+    
+    def fetch_partition(self, query, low, high, spool_path):
+        """在独立的池连接上拉取一个键区间，按批次落到本地临时文件，返回列名和表结构"""
+        column = query.get('partition_column', 'ID')
+        sql = f"SELECT * FROM ({query['sql']}) WHERE {column} BETWEEN :low AND :high ORDER BY {column}"
+        
+        connection = self.get_connection()
+        try:
+            cursor = self.open_stream_cursor(connection, sql, self.bind_params(sql, {'low': low, 'high': high}))
+            columns = [col[0] for col in cursor.description]
+            schema = arrow_schema(cursor.description)
+            with open(spool_path, 'wb') as spool:
+                for rows in self.iter_batches(cursor):
+                    pickle.dump(rows, spool, protocol=pickle.HIGHEST_PROTOCOL)
+            return columns, schema
+        finally:
+            connection.close()
+    
+    def read_spool(self, spool_path):
+        """逐批读出分区临时文件"""
+        with open(spool_path, 'rb') as spool:
+            while True:
+                try:
+                    yield pickle.load(spool)
+                except EOFError:
+                    break
+    
+    def fetch_partitioned(self, query):
+        """并发拉取各键区间，返回列名、按区间顺序合并的批次生成器和表结构
+
+        各分区先落到本地临时文件，拉取线程从不等待写入方，
+        因此不会因连接池耗尽而互相等待；写入方按区间顺序读取，
+        前面的分区写入时后面的分区仍在并发拉取。
+        """
+        ranges = self.partition_ranges(query)
+        if not ranges:
+            return None
+        
+        self.logger.info(f"报表查询 {query['name']} 按 {query.get('partition_column', 'ID')} 切分为 {len(ranges)} 个区间并发拉取")
+        
+        spool_dir = tempfile.mkdtemp(prefix='partition_')
+        spool_paths = [os.path.join(spool_dir, f"part_{index}.pkl") for index in range(len(ranges))]
+        executor = ThreadPoolExecutor(max_workers=len(ranges))
+        futures = [
+            executor.submit(self.fetch_partition, query, low, high, spool_path)
+            for (low, high), spool_path in zip(ranges, spool_paths)
+        ]
+        
+        def merged_batches():
+            try:
+                for future, spool_path in zip(futures, spool_paths):
+                    future.result()
+                    yield from self.read_spool(spool_path)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+                shutil.rmtree(spool_dir, ignore_errors=True)
+        
+        try:
+            columns, schema = futures[0].result()
+        except Exception:
+            executor.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(spool_dir, ignore_errors=True)
+            raise
+        
+        return columns, merged_batches(), schema
+    
+    def iter_arrow_batches(self, connection, sql, params=None):
+        """以Arrow列式批次读取查询结果（oracledb fetch_df_batches），不产生逐行Python对象
+
+        首个批次的耗时包含语句执行，统一计入 db_fetch 阶段。
+        """
+        total = 0
+        data_frames = connection.fetch_df_batches(sql, parameters=params, size=QUERY_CONFIG.get('fetch_arraysize', 5000))
+        while True:
+            with self.metrics.phase('db_fetch'):
+                data_frame = next(data_frames, None)
+                if data_frame is None:
+                    break
+                table = pa.table(data_frame)
+            total += table.num_rows
+            self.metrics.count('rows_fetched', table.num_rows)
+            yield table
+        self.logger.info(f"列式读取完成，共 {total} 条记录")
+    
+    def describe_query(self, connection, sql):
+        """只解析不执行，获取查询的列名"""
+        cursor = connection.cursor()
+        try:
+            cursor.parse(sql)
+            return [col[0] for col in cursor.description]
+        finally:
+            cursor.close()
+    
+    def write_batches(self, query, sheet, columns, batches, write_lock, schema=None):
+        """将列名和数据批次写入工作表，返回写入行数
+
+        批次可以是行元组列表，也可以是Arrow表（列式读取、列式存储或缓存）；
+        schema 为由游标描述得到的表结构，Parquet等列式格式据此确定文件的列类型。
+        """
+        sheet.set_columns(columns, schema)
+        start = time.perf_counter()
+        
+        # 读取不持锁，只有写入工作簿时串行
+        for batch in batches:
+            self.write_batch(sheet, batch, write_lock)
+        
+        return self.finish_sheet(query, sheet, start)
+    
+    def write_batch(self, sheet, batch, write_lock):
+        """持写入器的锁写入一个批次，等锁时间不计入 write 阶段"""
+        with write_lock, self.metrics.phase('write'):
+            if isinstance(batch, pa.Table):
+                sheet.write_arrow(batch)
+            else:
+                sheet.write_rows(batch)
+    
+    def finish_sheet(self, query, sheet, start):
+        """记录工作表写入行数和速率，返回写入行数"""
+        self.metrics.count('rows_written', sheet.row_count)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            self.logger.info(f"报表查询 {query['name']} 读取并写入 {sheet.row_count} 行，用时 {elapsed:.2f} 秒，{sheet.row_count / elapsed:.0f} 行/秒")
+        return sheet.row_count
+    
+    def write_query_sheet(self, query, sheet, write_lock):
+        """在独立的池连接上执行一个报表查询，并将结果写入对应工作表"""
+        incremental = bool(query.get('incremental_column'))
+        params = self.bind_params(query['sql'])
+        columnar = query.get('fetch_mode', QUERY_CONFIG.get('fetch_mode', 'tuple')) == 'arrow'
+        
+        # 命中结果缓存时不占用数据库连接
+        if self.cache is not None and not incremental:
+            cached = self.cache.get(query['sql'], params)
+            if cached:
+                columns, batches, schema = cached
+                return self.write_batches(query, sheet, columns, batches, write_lock, schema)
+        
+        # 分区并行：按键区间在多个池连接上并发拉取，按区间顺序合并写入
+        if not incremental and query.get('parallel_degree', 1) > 1:
+            result = self.fetch_partitioned(query)
+            if result:
+                columns, batches, schema = result
+                if self.cache is not None:
+                    batches = self.cache.record(query['sql'], params, columns, batches, schema)
+                return self.write_batches(query, sheet, columns, batches, write_lock, schema)
+        
+        connection = self.get_connection()
+        try:
+            # 增量模式：Oracle只返回新增行，报表从本地行存储生成
+            if incremental:
+                store = self.fetch_incremental(connection, query)
+                batch_size = QUERY_CONFIG.get('fetch_arraysize', 5000)
+                batches = store.iter_tables(batch_size) if columnar else store.iter_batches(batch_size)
+                return self.write_batches(query, sheet, store.columns, batches, write_lock, store.stored_schema())
+            
+            # 列式模式的批次自带类型，不需要另给表结构
+            schema = None
+            if columnar:
+                # 列式模式：列名取自首个Arrow批次，空结果时解析SQL获取
+                tables = self.iter_arrow_batches(connection, query['sql'], params)
+                first = next(tables, None)
+                if first is None:
+                    columns, batches = self.describe_query(connection, query['sql']), []
+                else:
+                    columns, batches = first.column_names, itertools.chain([first], tables)
+            else:
+                cursor = self.open_stream_cursor(connection, query['sql'], params)
+                columns = [col[0] for col in cursor.description]
+                schema = arrow_schema(cursor.description)
+                batches = self.iter_batches(cursor)
+            
+            # 边写报表边写缓存
+            if self.cache is not None:
+                batches = self.cache.record(query['sql'], params, columns, batches, schema)
+            
+            return self.write_batches(query, sheet, columns, batches, write_lock, schema)
+            
+        finally:
+            connection.close()
+    
+    def build_summary_query(self):
+        """根据 SUMMARY_CONFIG 生成分类汇总查询
+
+        各维度作为一个分组集合，由Oracle在一次往返中完成全部分组计数，
+        结果的“汇总维度”列标明每行属于哪个维度。
+        """
+        dimensions = SUMMARY_CONFIG['dimensions']
+        columns = [dimension['column'] for dimension in dimensions]
+        
+        label_cases = "\n".join(
+            f"                WHEN GROUPING({dimension['column']}) = 0 THEN '{dimension['label']}'"
+            for dimension in dimensions
+        )
+        grouping_sets = [f"({column})" for column in columns]
+        if SUMMARY_CONFIG.get('include_total', True):
+            grouping_sets.append("()")
+        
+        source = SUMMARY_CONFIG['source']
+        if source.strip().upper().startswith('SELECT'):
+            source = f"({source})"
+        where = f"\n            WHERE {SUMMARY_CONFIG['where']}" if SUMMARY_CONFIG.get('where') else ""
+        
+        # SQLite副本不支持 GROUPING SETS，改为逐维度 UNION ALL
+        if self.source == 'replica':
+            return self.build_summary_union(dimensions, source, where)
+        
+        sql = f"""
+            SELECT
+                CASE
+{label_cases}
+                ELSE '总计'
+                END AS SUMMARY_DIMENSION,
+                {', '.join(columns)},
+                COUNT(*) AS VISIT_COUNT
+            FROM {source}{where}
+            GROUP BY GROUPING SETS ({', '.join(grouping_sets)})
+            ORDER BY GROUPING_ID({', '.join(columns)}), VISIT_COUNT DESC
+        """
+        
+        return {
+            'name': SUMMARY_CONFIG.get('name', 'summary'),
+            'sheet_name': SUMMARY_CONFIG['sheet_name'],
+            'sql': sql,
+            'format': SUMMARY_CONFIG.get('format', 'xlsx')
+        }
+    
+    def build_summary_union(self, dimensions, source, where):
+        """生成与 GROUPING SETS 版本结果相同的 UNION ALL 分类汇总查询（用于SQLite副本）"""
+        columns = [dimension['column'] for dimension in dimensions]
+        groups = [(dimension['label'], [dimension['column']]) for dimension in dimensions]
+        if SUMMARY_CONFIG.get('include_total', True):
+            groups.append(('总计', []))
+        
+        branches = []
+        for order, (label, group_columns) in enumerate(groups):
+            select_list = ", ".join(column if column in group_columns else f"NULL AS {column}" for column in columns)
+            group_by = f" GROUP BY {', '.join(group_columns)}" if group_columns else ""
+            branches.append(
+                f"                SELECT {order} AS GROUP_ORDER, '{label}' AS SUMMARY_DIMENSION, {select_list}, "
+                f"COUNT(*) AS VISIT_COUNT FROM {source}{where.strip() and ' ' + where.strip()}{group_by}"
+            )
+        union = "\n                UNION ALL\n".join(branches)
+        
+        sql = f"""
+            SELECT SUMMARY_DIMENSION, {', '.join(columns)}, VISIT_COUNT
+            FROM (
+{union}
+            )
+            ORDER BY GROUP_ORDER, VISIT_COUNT DESC
+        """
+        
+        return {
+            'name': SUMMARY_CONFIG.get('name', 'summary'),
+            'sheet_name': SUMMARY_CONFIG['sheet_name'],
+            'sql': sql,
+            'format': SUMMARY_CONFIG.get('format', 'xlsx')
+        }
+    
+    def extract_queries(self, queries):
+        """并发执行多个报表查询，按各自的输出格式写入报表文件
+
+        xlsx格式的查询共用一个工作簿、各占一张工作表；其他格式每个查询单独输出一个文件。
+        返回生成的文件路径列表，任一查询失败时返回 None。
+        """
+        writers = []
+        try:
+            targets = self.open_writers(queries, writers)
+            failed = self.run_targets(targets)
+            return self.close_writers(writers, failed)
+            
+        except Exception as e:
+            self.logger.error(f"保存报表文件失败: {str(e)}")
+            for writer, _ in writers:
+                writer.discard()
+            return None
+    
+    def run_targets(self, targets):
+        """并发执行 (查询, 工作表, 写入锁) 列表中的各查询，返回失败的查询名称列表"""
+        max_workers = max(1, min(QUERY_CONFIG.get('max_workers', 3), len(targets)))
+        self.logger.info(f"开始执行 {len(targets)} 个报表查询，并发数 {max_workers}")
+        
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.write_query_sheet, query, sheet, write_lock): query
+                for query, sheet, write_lock in targets
+            }
+            for future in as_completed(futures):
+                query = futures[future]
+                try:
+                    count = future.result()
+                    self.logger.info(f"报表查询 {query['name']} 完成，共 {count} 条记录")
+                except Exception as e:
+                    self.logger.error(f"报表查询 {query['name']} 失败: {str(e)}")
+                    failed.append(query['name'])
+        return failed
+    
+    def open_fingerprinted(self, queries, spool_dir, writers):
+        """为各报表查询创建边写入边计算内容哈希的工作表，返回 (查询, 工作表, 写入锁) 列表
+
+        CSV/Parquet 直接写入报表文件，内容未变化时丢弃即可；xlsx写入成本高，
+        先暂存到本地，内容有变化时再写入工作簿。直接写入的写入器追加到 writers。
+        """
+        direct = iter(self.open_writers([query for query in queries if query.get('format', 'xlsx') != 'xlsx'], writers))
+        targets = []
+        for index, query in enumerate(queries):
+            if query.get('format', 'xlsx') == 'xlsx':
+                targets.append((query, SpoolSheet(os.path.join(spool_dir, f"query_{index}.pkl")), threading.Lock()))
+            else:
+                _, sheet, write_lock = next(direct)
+                targets.append((query, HashingSheet(sheet), write_lock))
+        return targets
+    
+    def finish_fingerprinted(self, queries, targets, writers, failed):
+        """比较内容指纹，有变化时由暂存数据写出xlsx并保存全部报表文件
+
+        返回文件路径列表；内容未变化时丢弃已写出的文件，返回空列表；查询失败时返回 None。
+        """
+        spools = [(query, sheet) for query, sheet, _ in targets if isinstance(sheet, SpoolSheet)]
+        for _, spool in spools:
+            spool.close()
+        
+        if failed:
+            return self.close_writers(writers, failed)
+        
+        self.fingerprint = combine_fingerprint(queries, [sheet for _, sheet, _ in targets])
+        if self.fingerprint == self.fingerprint_store.load():
+            self.unchanged = True
+            self.logger.info(f"报表内容与上次发送时相同（指纹 {self.fingerprint[:12]}），不生成报表文件")
+            for writer, _ in writers:
+                writer.discard()
+            return []
+        
+        # 行数已在暂存时统计，这里只计入写入耗时；工作簿排在其他文件之前
+        workbooks = []
+        try:
+            for (_, sheet, write_lock), (_, spool) in zip(self.open_writers([query for query, _ in spools], workbooks), spools):
+                sheet.set_columns(spool.columns, spool.schema)
+                for batch in spool.read_batches():
+                    self.write_batch(sheet, batch, write_lock)
+        finally:
+            writers[:0] = workbooks
+        return self.close_writers(writers, [])
+    
+    def extract_queries_fingerprinted(self, queries):
+        """写入报表的同时计算内容指纹，内容未变化时不保留报表文件"""
+        spool_dir = tempfile.mkdtemp(prefix='fingerprint_')
+        writers = []
+        try:
+            targets = self.open_fingerprinted(queries, spool_dir, writers)
+            failed = self.run_targets(targets)
+            return self.finish_fingerprinted(queries, targets, writers, failed)
+            
+        except Exception as e:
+            self.logger.error(f"保存报表文件失败: {str(e)}")
+            for writer, _ in writers:
+                writer.discard()
+            return None
+        
+        finally:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+    
+    def commit_fingerprint(self):
+        """报表发送成功后记录本次的内容指纹"""
+        if self.fingerprint_store is not None and self.fingerprint and not self.unchanged:
+            self.fingerprint_store.save(self.fingerprint, self.output_files)
+    
+    def open_writers(self, queries, writers):
+        """为各报表查询创建写入器和工作表，返回 (查询, 工作表, 写入锁) 列表
+
+        创建的写入器及其锁追加到 writers，便于调用方在出错时丢弃。
+        """
+        # 确保输出目录存在
+        ensure_output_dir()
+        
+        # 工作表按配置顺序创建，与查询完成的先后无关；每个写入器一把锁
+        workbook = None
+        targets = []
+        for query in queries:
+            output_format = query.get('format', 'xlsx')
+            if output_format == 'xlsx':
+                if workbook is None:
+                    workbook = (self.create_excel_writer(get_filepath()), threading.Lock())
+                    writers.append(workbook)
+                writer, write_lock = workbook
+            else:
+                filepath = get_filepath(query['name'], FORMAT_EXTENSIONS.get(output_format, ''))
+                writer, write_lock = create_writer(output_format, filepath), threading.Lock()
+                writers.append((writer, write_lock))
+            targets.append((query, writer.add_sheet(query['sheet_name']), write_lock))
+        return targets
+    
+    def close_writers(self, writers, failed):
+        """全部查询成功时保存各写入器并返回文件路径列表，否则丢弃并返回 None"""
+        if failed:
+            self.logger.error(f"以下报表查询失败，不生成文件: {', '.join(failed)}")
+            for writer, _ in writers:
+                writer.discard()
+            return None
+        
+        # 超过行数上限时xlsx写入器会续写出多个文件
+        files = []
+        for writer, _ in writers:
+            files.extend(self.save_writer(writer))
+        
+        self.logger.info(f"数据已保存到: {', '.join(files)}")
+        return files
+    
+    def report_queries(self):
+        """本次运行的全部报表查询，分类汇总作为一个普通报表查询并发执行
+
+        在本地副本上执行时，查询可用 replica_sql 提供SQLite方言的SQL。
+        """
+        queries = list(get_report_queries())
+        if self.source == 'replica':
+            queries = [dict(query, sql=query['replica_sql']) if query.get('replica_sql') else query for query in queries]
+        if SUMMARY_CONFIG.get('enabled'):
+            queries.append(self.build_summary_query())
+        return queries
+    
+    def save_writer(self, writer):
+        """保存写入器并统计输出文件大小，返回文件路径列表"""
+        with self.metrics.phase('save'):
+            files = writer.save()
+        self.count_output_bytes(files)
+        return files
+    
+    def count_output_bytes(self, files):
+        """累计输出文件字节数"""
+        for path in files:
+            if os.path.exists(path):
+                self.metrics.count('bytes_written', os.path.getsize(path))
+    
+    def save_to_excel(self, columns, rows):
+        """将数据保存为Excel文件"""
+        try:
+            # 确保输出目录存在
+            ensure_output_dir()
+            
+            # 获取文件路径
+            filepath = get_filepath()
+            
+            # 创建DataFrame
+            df = pd.DataFrame(rows, columns=columns)
+            
+            # 保存为Excel文件
+            with self.metrics.phase('write'), pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+                df.to_excel(writer, sheet_name=QUERY_CONFIG['sheet_name'], index=False)
+                
+                # 获取工作表对象
+                worksheet = writer.sheets[QUERY_CONFIG['sheet_name']]
+                
+                # 设置列宽
+                for column in worksheet.columns:
+                    max_length = 0
+                    column_letter = column[0].column_letter
+                    
+                    for cell in column:
+                        try:
+                            if len(str(cell.value)) > max_length:
+                                max_length = len(str(cell.value))
+                        except:
+                            pass
+                    
+                    adjusted_width = min(max_length + 2, 50)
+                    worksheet.column_dimensions[column_letter].width = adjusted_width
+                
+                # 设置表头样式
+                header_font = Font(bold=True, color="FFFFFF")
+                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+                header_alignment = Alignment(horizontal="center", vertical="center")
+                
+                for cell in worksheet[1]:
+                    cell.font = header_font
+                    cell.fill = header_fill
+                    cell.alignment = header_alignment
+            
+            self.count_output_bytes([filepath])
+            self.logger.info(f"数据已保存到: {filepath}")
+            return filepath
+            
+        except Exception as e:
+            self.logger.error(f"保存Excel文件失败: {str(e)}")
+            return None
+    
+    def extract_and_save(self):
+        """执行完整的数据提取和保存流程，返回生成的文件路径列表"""
+        try:
+            self.logger.info("开始数据提取流程")
+            self.fingerprint = None
+            self.unchanged = False
+            
+            # 流式模式：各报表查询在池连接上边读取边写入
+            if QUERY_CONFIG.get('streaming'):
+                # 启用内容指纹时边写入边计算，内容未变化则返回空列表
+                if self.fingerprint_store is not None:
+                    files = self.extract_queries_fingerprinted(self.report_queries())
+                    if self.unchanged:
+                        self.output_files = []
+                        return []
+                else:
+                    files = self.extract_queries(self.report_queries())
+                if not files:
+                    return None
+                
+                self.output_files = files
+                return files
+            
+            # 连接数据库
+            if not self.connect_database():
+                return None
+            
+            # 执行查询
+            result = self.execute_query()
+            if not result:
+                return None
+            
+            columns, rows = result
+            
+            # 保存到Excel
+            filepath = self.save_to_excel(columns, rows)
+            if not filepath:
+                return None
+            
+            self.output_files = [filepath]
+            return self.output_files
+            
+        except Exception as e:
+            self.logger.error(f"数据提取流程失败: {str(e)}")
+            return None
+        
+        finally:
+            # 关闭数据库连接
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+                self.logger.info("数据库连接已归还连接池")
+    
+    def test_connection(self):
+        """测试数据库连接"""
+        try:
+            if self.connect_database():
+                cursor = self.connection.cursor()
+                # SQLite副本没有 DUAL 表
+                cursor.execute("SELECT 1" if self.source == 'replica' else "SELECT 1 FROM DUAL")
+                result = cursor.fetchone()
+                cursor.close()
+                self.connection.close()
+                self.connection = None
+                
+                if result:
+                    self.logger.info("数据库连接测试成功")
+                    return True
+                    
+        except Exception as e:
+            self.logger.error(f"数据库连接测试失败: {str(e)}")
+            
+        return False
+
+def main():
+    """主函数 - 用于测试"""
+    extractor = DatabaseExtractor()
+    
+    # 测试连接
+    if extractor.test_connection():
+        print("数据库连接测试通过")
+        
+        # 执行数据提取
+        files = extractor.extract_and_save()
+        if files:
+            print(f"数据提取完成，文件保存在: {', '.join(files)}")
+        else:
+            print("数据提取失败")
+    else:
+        print("数据库连接测试失败")
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
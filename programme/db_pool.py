@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Oracle连接池模块
+进程内所有Oracle访问共用同一个连接池，避免每次重新建立会话
+"""
+
+import logging
+import threading
+import oracledb
+from config import DATABASE_CONFIG
+
+_pool = None
+_pool_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def pool_params():
+    """同步和异步连接池共用的连接参数"""
+    dsn = oracledb.makedsn(
+        DATABASE_CONFIG['host'],
+        DATABASE_CONFIG['port'],
+        service_name=DATABASE_CONFIG['service_name']
+    )
+    return {
+        'user': DATABASE_CONFIG['username'],
+        'password': DATABASE_CONFIG['password'],
+        'dsn': dsn,
+        'min': DATABASE_CONFIG.get('pool_min', 1),
+        'max': DATABASE_CONFIG.get('pool_max', 4),
+        'increment': DATABASE_CONFIG.get('pool_increment', 1),
+        'ping_interval': DATABASE_CONFIG.get('pool_ping_interval', 60),
+        'stmtcachesize': DATABASE_CONFIG.get('stmtcachesize', 50),
+        'getmode': oracledb.POOL_GETMODE_WAIT
+    }
+
+
+def get_pool():
+    """获取（首次调用时创建）进程级连接池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = oracledb.create_pool(**pool_params())
+            logger.info(f"数据库连接池已创建: min={_pool.min}, max={_pool.max}")
+    return _pool
+
+
+def acquire_connection():
+    """从连接池获取连接，调用方 close() 时连接归还连接池"""
+    return get_pool().acquire()
+
+
+def close_pool():
+    """关闭连接池"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close(force=True)
+            _pool = None
+            logger.info("数据库连接池已关闭")
+
+
+def create_async_pool():
+    """创建asyncio连接池（仅Thin模式）
+
+    异步连接池绑定创建它的事件循环，因此不做进程级缓存，由调用方在同一事件循环内关闭。
+    """
+    pool = oracledb.create_pool_async(**pool_params())
+    logger.info(f"异步数据库连接池已创建: min={pool.min}, max={pool.max}")
+    return pool
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+投递报告模块
+记录一次发送中每个收件人、每个附件的投递结果，
+发送结束后输出汇总日志，并以每封邮件一行JSON追加到投递记录文件
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from config import EMAIL_CONFIG
+
+
+class DeliveryReport:
+    """一次发送的逐收件人投递结果"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.records = []
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, recipient, filepath, success, error=None, seconds=0.0, reopened=None):
+        """记录一封邮件的投递结果，reopened 为重新打开写邮件页面并重新上传附件的原因"""
+        self.records.append({
+            'recipient': recipient,
+            'attachment': os.path.basename(filepath) if filepath else None,
+            'success': success,
+            'error': error,
+            'reopened': reopened,
+            'seconds': round(seconds, 3)
+        })
+
+    @property
+    def failed(self):
+        """投递失败的记录"""
+        return [record for record in self.records if not record['success']]
+
+    @property
+    def all_delivered(self):
+        return bool(self.records) and not self.failed
+
+    def summary(self):
+        """汇总文字，失败时列出收件人和原因"""
+        text = f"投递 {len(self.records)} 封，成功 {len(self.records) - len(self.failed)} 封，失败 {len(self.failed)} 封"
+        reopened = [record for record in self.records if record['reopened']]
+        if reopened:
+            text += f"，重新上传附件 {len(reopened)} 次"
+        for record in self.failed:
+            text += f"\n  ✗ {record['recipient']}（{record['attachment'] or '无附件'}）: {record['error']}"
+        return text
+
+    def write(self, path=None):
+        """输出汇总日志，path 不为空时逐封追加JSON记录"""
+        if self.failed:
+            self.logger.error(f"投递报告: {self.summary()}")
+        else:
+            self.logger.info(f"投递报告: {self.summary()}")
+
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                for record in self.records:
+                    f.write(json.dumps(dict(record, sent_at=self.started_at.isoformat()), ensure_ascii=False) + "\n")
+        except Exception as e:
+            self.logger.error(f"写入投递报告失败: {str(e)}")
+
+
+def fan_out(deliver, filepaths, recipients, metrics=None, notice=None):
+    """把每个附件逐个发送给每个收件人，返回投递报告
+
+    deliver(recipient, filepath, part, notice) 在已登录的会话中发送一封邮件并返回
+    (是否成功, 失败原因, 重新打开原因)，重新打开原因为重新打开写邮件页面并重新上传附件的原因，没有时为 None；
+    某个收件人失败时记录原因并继续发送其余收件人。
+    """
+    report = DeliveryReport()
+    for index, filepath in enumerate(filepaths, start=1):
+        part = (index, len(filepaths)) if len(filepaths) > 1 else None
+        for recipient in recipients:
+            start = time.perf_counter()
+            try:
+                success, error, reopened = deliver(recipient, filepath, part, notice)
+            except Exception as e:
+                success, error, reopened = False, str(e), None
+            if not success and metrics is not None:
+                metrics.count('emails_failed')
+            report.add(recipient, filepath, success, error, time.perf_counter() - start, reopened)
+    return report
+
+
+def send_to_recipients(sender, filepaths, notice=None):
+    """在发送器已登录的会话中把每个附件逐个发送给 EMAIL_CONFIG['recipients'] 中的每个收件人
+
+    EmailSender 和 HttpEmailSender 共用：sender 提供 deliver、metrics 和 logger，
+    投递报告保存在 sender.report 中并按 delivery_report_path 追加记录，返回是否全部投递成功。
+    notice 不为空时发送一封无附件的提示邮件，filepaths 应为 [None]。
+    """
+    if isinstance(filepaths, str):
+        filepaths = [filepaths]
+
+    missing = [filepath for filepath in filepaths if filepath and not os.path.exists(filepath)]
+    if missing:
+        sender.logger.error(f"附件不存在: {', '.join(missing)}")
+        return False
+
+    recipients = EMAIL_CONFIG['recipients']
+    if notice:
+        sender.logger.info("开始发送提示邮件")
+    else:
+        sender.logger.info(f"开始发送邮件，共 {len(filepaths)} 个附件、{len(recipients)} 个收件人")
+
+    sender.report = fan_out(sender.deliver, filepaths, recipients, sender.metrics, notice)
+    sender.report.write(EMAIL_CONFIG.get('delivery_report_path'))
+    return sender.report.all_delivered
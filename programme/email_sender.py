@@ -1,296 +1,569 @@
-# -*- coding: utf-8 -*-
-"""
-邮件发送模块
-自动登录OA系统并发送邮件
-"""
-
-import time
-import logging
-import os
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from config import EMAIL_CONFIG, get_filename
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('email_sender.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-class EmailSender:
-    """邮件发送器"""
-    
-    def __init__(self):
-        self.driver = None
-        self.logger = logging.getLogger(__name__)
-        self.wait = None
-        
-    def setup_driver(self):
-        """设置Chrome浏览器驱动"""
-        try:
-            # Chrome选项配置
-            chrome_options = Options()
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            
-            # 可选：无头模式（不显示浏览器窗口）
-            # chrome_options.add_argument('--headless')
-            
-            # 自动下载并设置ChromeDriver
-            service = Service(ChromeDriverManager().install())
-            
-            # 创建WebDriver实例
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.wait = WebDriverWait(self.driver, 20)
-            
-            self.logger.info("Chrome浏览器驱动设置成功")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"浏览器驱动设置失败: {str(e)}")
-            return False
-    
-    def login_oa_system(self):
-        """登录OA系统"""
-        try:
-            self.logger.info("开始登录OA系统")
-            
-            # 访问OA系统登录页面
-            self.driver.get(EMAIL_CONFIG['oa_url'])
-            self.logger.info(f"访问OA系统: {EMAIL_CONFIG['oa_url']}")
-            
-            # 等待页面加载
-            time.sleep(3)
-            
-            # 查找并填写用户名
-            username_input = self.wait.until(
-                EC.presence_of_element_located((By.NAME, "username"))
-            )
-            username_input.clear()
-            username_input.send_keys(EMAIL_CONFIG['username'])
-            self.logger.info("用户名填写完成")
-            
-            # 查找并填写密码
-            password_input = self.driver.find_element(By.NAME, "password")
-            password_input.clear()
-            password_input.send_keys(EMAIL_CONFIG['password'])
-            self.logger.info("密码填写完成")
-            
-            # 点击登录按钮
-            login_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
-            login_button.click()
-            self.logger.info("点击登录按钮")
-            
-            # 等待登录成功
-            time.sleep(5)
-            
-            # 检查是否登录成功（根据实际OA系统调整）
-            if "dashboard" in self.driver.current_url or "main" in self.driver.current_url:
-                self.logger.info("OA系统登录成功")
-                return True
-            else:
-                self.logger.error("OA系统登录失败")
-                return False
-                
-        except Exception as e:
-            self.logger.error(f"登录OA系统失败: {str(e)}")
-            return False
-    
-    def navigate_to_email(self):
-        """导航到邮件发送页面"""
-        try:
-            self.logger.info("导航到邮件发送页面")
-            
-            # 查找并点击邮件菜单（根据实际OA系统调整）
-            email_menu = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//a[contains(text(),'邮件') or contains(text(),'Email')]"))
-            )
-            email_menu.click()
-            time.sleep(2)
-            
-            # 查找并点击写邮件按钮
-            compose_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'写邮件') or contains(text(),'Compose')]"))
-            )
-            compose_button.click()
-            time.sleep(2)
-            
-            self.logger.info("成功进入邮件编写页面")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"导航到邮件页面失败: {str(e)}")
-            return False
-    
-    def fill_email_content(self, filepath):
-        """填写邮件内容"""
-        try:
-            self.logger.info("开始填写邮件内容")
-            
-            # 填写收件人
-            recipients_input = self.wait.until(
-                EC.presence_of_element_located((By.NAME, "to"))
-            )
-            recipients_input.clear()
-            recipients_input.send_keys(", ".join(EMAIL_CONFIG['recipients']))
-            self.logger.info("收件人填写完成")
-            
-            # 填写邮件主题
-            subject_input = self.driver.find_element(By.NAME, "subject")
-            subject_input.clear()
-            current_date = datetime.now().strftime('%Y年%m月%d日')
-            subject = f"{EMAIL_CONFIG['subject_prefix']} - {current_date}"
-            subject_input.send_keys(subject)
-            self.logger.info("邮件主题填写完成")
-            
-            # 填写邮件正文
-            body_input = self.driver.find_element(By.NAME, "body")
-            body_input.clear()
-            body_content = f"""
-            您好！
-            
-            附件为今日数据报表，请查收。
-            
-            生成时间：{datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}
-            
-            此邮件为系统自动发送，请勿回复。
-            """
-            body_input.send_keys(body_content)
-            self.logger.info("邮件正文填写完成")
-            
-            # 上传附件
-            if filepath and os.path.exists(filepath):
-                file_input = self.driver.find_element(By.NAME, "attachment")
-                file_input.send_keys(filepath)
-                self.logger.info(f"附件上传完成: {filepath}")
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"填写邮件内容失败: {str(e)}")
-            return False
-    
-    def send_email(self):
-        """发送邮件"""
-        try:
-            self.logger.info("开始发送邮件")
-            
-            # 点击发送按钮
-            send_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'发送') or contains(text(),'Send')]"))
-            )
-            send_button.click()
-            
-            # 等待发送完成
-            time.sleep(5)
-            
-            # 检查发送结果（根据实际OA系统调整）
-            success_message = self.driver.find_elements(By.XPATH, "//div[contains(text(),'发送成功') or contains(text(),'Success')]")
-            
-            if success_message:
-                self.logger.info("邮件发送成功")
-                return True
-            else:
-                self.logger.error("邮件发送失败")
-                return False
-                
-        except Exception as e:
-            self.logger.error(f"发送邮件失败: {str(e)}")
-            return False
-    
-    def send_email_with_attachment(self, filepath):
-        """完整的邮件发送流程"""
-        try:
-            self.logger.info("开始邮件发送流程")
-            
-            # 设置浏览器驱动
-            if not self.setup_driver():
-                return False
-            
-            # 登录OA系统
-            if not self.login_oa_system():
-                return False
-            
-            # 导航到邮件页面
-            if not self.navigate_to_email():
-                return False
-            
-            # 填写邮件内容
-            if not self.fill_email_content(filepath):
-                return False
-            
-            # 发送邮件
-            if not self.send_email():
-                return False
-            
-            self.logger.info("邮件发送流程完成")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"邮件发送流程失败: {str(e)}")
-            return False
-        
-        finally:
-            # 关闭浏览器
-            if self.driver:
-                self.driver.quit()
-                self.logger.info("浏览器已关闭")
-    
-    def test_oa_connection(self):
-        """测试OA系统连接"""
-        try:
-            if not self.setup_driver():
-                return False
-            
-            self.driver.get(EMAIL_CONFIG['oa_url'])
-            time.sleep(3)
-            
-            if "login" in self.driver.current_url or "登录" in self.driver.page_source:
-                self.logger.info("OA系统连接测试成功")
-                return True
-            else:
-                self.logger.error("OA系统连接测试失败")
-                return False
-                
-        except Exception as e:
-            self.logger.error(f"OA系统连接测试失败: {str(e)}")
-            return False
-        
-        finally:
-            if self.driver:
-                self.driver.quit()
-
-def main():
-    """主函数 - 用于测试"""
-    sender = EmailSender()
-    
-    # 测试OA系统连接
-    if sender.test_oa_connection():
-        print("OA系统连接测试通过")
-        
-        # 测试邮件发送（需要提供文件路径）
-        test_filepath = "D:\\data_reports\\test_file.xlsx"
-        if os.path.exists(test_filepath):
-            if sender.send_email_with_attachment(test_filepath):
-                print("邮件发送测试成功")
-            else:
-                print("邮件发送测试失败")
-        else:
-            print(f"测试文件不存在: {test_filepath}")
-    else:
-        print("OA系统连接测试失败")
-
-if __name__ == "__main__":
+# -*- coding: utf-8 -*-
+"""
+邮件发送模块
+自动登录OA系统并发送邮件
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from config import EMAIL_CONFIG, get_filename
+from run_metrics import RunMetrics
+from browser_waits import PageWaiter, url_contains_any
+from browser_profile import create_driver
+from delivery_report import send_to_recipients
+
+# OA页面上的结果提示
+SUCCESS_BANNER = (By.XPATH, "//div[contains(text(),'发送成功') or contains(text(),'Success')]")
+ERROR_BANNER = (By.XPATH, "//div[contains(@class,'flash') and contains(@class,'error')]")
+
+# 写邮件表单提交到该隐藏iframe，发送后写邮件页面不跳转，已填写的表单和附件可供下一个收件人复用
+RESULT_FRAME = 'send_result'
+
+# 结果iframe中出现登录表单（提交时会话已失效）时的失败原因，deliver 据此重新登录后重试
+SESSION_EXPIRED = "OA会话已失效"
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('email_sender.log', encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+
+def build_subject(part=None, notice=None):
+    """邮件主题，part 为 (序号, 总数)，notice 不为空时标注数据无变化"""
+    current_date = datetime.now().strftime('%Y年%m月%d日')
+    subject = f"{EMAIL_CONFIG['subject_prefix']} - {current_date}"
+    if part:
+        subject += f"（{part[0]}/{part[1]}）"
+    if notice:
+        subject += "（数据无变化）"
+    return subject
+
+def build_body(notice=None):
+    """邮件正文，notice 不为空时直接使用 notice"""
+    return notice or f"""
+            您好！
+            
+            附件为今日数据报表，请查收。
+            
+            生成时间：{datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}
+            
+            此邮件为系统自动发送，请勿回复。
+            """
+
+def find_banner(driver, stale=()):
+    """查找发送成功或失败提示，返回 (是否成功, 提示文字)，都未出现时返回 None；stale 中的元素不计入"""
+    for success, locator in ((True, SUCCESS_BANNER), (False, ERROR_BANNER)):
+        for banner in driver.find_elements(*locator):
+            if banner.id not in stale:
+                return success, banner.text
+    return None
+
+class EmailSender:
+    """邮件发送器"""
+    
+    def __init__(self, metrics=None, persistent=None):
+        self.driver = None
+        self.logger = logging.getLogger(__name__)
+        self.waits = None
+        
+        # 浏览器启动、登录、上传等阶段的耗时指标
+        self.metrics = metrics or RunMetrics('email')
+        
+        # persistent 为真时 send_email_with_attachment 发送后保持浏览器打开，后续发送复用同一会话
+        self.persistent = EMAIL_CONFIG.get('persistent_session', False) if persistent is None else persistent
+        self.cookie_path = EMAIL_CONFIG.get('cookie_path')
+        
+        # 第一次经菜单进入写邮件页面后记录其地址，之后的邮件直接打开
+        self.compose_url = None
+        
+        # 当前写邮件页面上已填写（含已选择附件）的表单：(附件, 序号, 提示) 及其主题；
+        # 上次发送失败的表单，重新打开时记入投递报告
+        self.compose_form = None
+        self.compose_subject = None
+        self.failed_form = None
+        
+        # 最近一次 send_files / send_notice 的逐收件人投递结果
+        self.report = None
+        
+    def setup_driver(self):
+        """设置Chrome浏览器驱动"""
+        try:
+            # 按 BROWSER_CONFIG 创建浏览器（lean 配置无头运行并屏蔽静态资源）
+            self.driver = create_driver()
+            self.waits = PageWaiter(self.driver)
+            
+            self.logger.info("Chrome浏览器驱动设置成功")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"浏览器驱动设置失败: {str(e)}")
+            return False
+    
+    def login_oa_system(self):
+        """登录OA系统"""
+        try:
+            self.logger.info("开始登录OA系统")
+            
+            # 访问OA系统登录页面
+            self.driver.get(EMAIL_CONFIG['oa_url'])
+            self.logger.info(f"访问OA系统: {EMAIL_CONFIG['oa_url']}")
+            
+            # 等待登录表单出现
+            username_input = self.waits.element('page_load', (By.NAME, "username"))
+            username_input.clear()
+            username_input.send_keys(EMAIL_CONFIG['username'])
+            self.logger.info("用户名填写完成")
+            
+            # 查找并填写密码
+            password_input = self.driver.find_element(By.NAME, "password")
+            password_input.clear()
+            password_input.send_keys(EMAIL_CONFIG['password'])
+            self.logger.info("密码填写完成")
+            
+            # 点击登录按钮
+            login_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
+            login_button.click()
+            self.logger.info("点击登录按钮")
+            
+            # 等待跳转到首页或出现错误提示（根据实际OA系统调整）
+            self.waits.until(
+                'login',
+                EC.any_of(url_contains_any("dashboard", "main"), EC.presence_of_element_located(ERROR_BANNER)),
+                "登录跳转"
+            )
+            
+            # 检查是否登录成功
+            if "dashboard" in self.driver.current_url or "main" in self.driver.current_url:
+                self.logger.info("OA系统登录成功")
+                self.save_cookies()
+                return True
+            else:
+                self.logger.error("OA系统登录失败")
+                return False
+                
+        except Exception as e:
+            self.logger.error(f"登录OA系统失败: {str(e)}")
+            return False
+    
+    def driver_alive(self):
+        """浏览器是否仍可用（长时间运行的会话中浏览器可能已被关闭或崩溃）"""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+    
+    def on_login_page(self):
+        """当前是否停留在登录页（会话失效时OA会跳转回 /login）"""
+        return "/login" in self.driver.current_url
+    
+    def save_cookies(self):
+        """将当前会话的Cookie保存到 cookie_path，供下次启动时跳过登录"""
+        if not self.cookie_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cookie_path) or '.', exist_ok=True)
+            temp_path = self.cookie_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.driver.get_cookies(), f)
+            os.replace(temp_path, self.cookie_path)
+            self.logger.info(f"会话Cookie已保存: {self.cookie_path}")
+        except Exception as e:
+            self.logger.warning(f"会话Cookie保存失败: {str(e)}")
+    
+    def restore_cookies(self):
+        """载入上次保存的Cookie，返回会话是否仍有效（未被跳转到登录页）"""
+        if not self.cookie_path or not os.path.exists(self.cookie_path):
+            return False
+        try:
+            with open(self.cookie_path, encoding='utf-8') as f:
+                cookies = json.load(f)
+            
+            # Cookie只能写入当前域名，先打开OA首页
+            self.driver.get(EMAIL_CONFIG['oa_url'])
+            self.driver.delete_all_cookies()
+            for cookie in cookies:
+                self.driver.add_cookie(cookie)
+            
+            self.driver.get(EMAIL_CONFIG['oa_url'])
+            self.waits.page_ready()
+            if self.on_login_page() or self.driver.find_elements(By.NAME, "password"):
+                self.logger.info("已保存的会话Cookie已失效，需要重新登录")
+                return False
+            
+            self.logger.info("已使用保存的会话Cookie恢复登录状态")
+            return True
+            
+        except Exception as e:
+            self.logger.warning(f"会话Cookie恢复失败: {str(e)}")
+            return False
+    
+    def navigate_to_email(self):
+        """导航到邮件发送页面"""
+        try:
+            self.logger.info("导航到邮件发送页面")
+            
+            # 已知写邮件页面地址时直接打开，不再逐级点击菜单
+            if self.compose_url:
+                self.driver.get(self.compose_url)
+                if self.on_login_page():
+                    # 会话已失效，由 open_compose 重新登录
+                    return False
+                try:
+                    self.waits.element('navigate', (By.NAME, "to"))
+                    return True
+                except TimeoutException:
+                    # 写邮件页面没有独立地址（例如由脚本弹出），改回菜单导航
+                    self.logger.info("写邮件页面无法直接打开，改为菜单导航")
+                    self.compose_url = None
+            
+            # 查找并点击邮件菜单（根据实际OA系统调整）
+            email_menu = self.waits.element(
+                'navigate', (By.XPATH, "//a[contains(text(),'邮件') or contains(text(),'Email')]"), clickable=True
+            )
+            email_menu.click()
+            
+            # 查找并点击写邮件按钮
+            compose_button = self.waits.element(
+                'navigate', (By.XPATH, "//button[contains(text(),'写邮件') or contains(text(),'Compose')]"), clickable=True
+            )
+            compose_button.click()
+            
+            # 等待写邮件表单出现
+            self.waits.element('navigate', (By.NAME, "to"))
+            self.compose_url = self.driver.current_url
+            
+            self.logger.info("成功进入邮件编写页面")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"导航到邮件页面失败: {str(e)}")
+            return False
+    
+    def fill_email_content(self, filepath, part=None, notice=None, recipient=None):
+        """填写邮件内容，part 为 (序号, 总数)，附件拆成多封邮件发送时标注在主题中
+
+        notice 不为空时发送无附件的提示邮件，正文为 notice；
+        recipient 为空时收件人栏填写全部收件人。
+        """
+        try:
+            self.logger.info("开始填写邮件内容")
+            
+            # 填写收件人
+            self.fill_recipient(recipient)
+            
+            # 填写邮件主题
+            self.compose_subject = build_subject(part, notice)
+            subject_input = self.driver.find_element(By.NAME, "subject")
+            subject_input.clear()
+            subject_input.send_keys(self.compose_subject)
+            self.logger.info("邮件主题填写完成")
+            
+            # 填写邮件正文
+            body_input = self.driver.find_element(By.NAME, "body")
+            body_input.clear()
+            body_input.send_keys(build_body(notice))
+            self.logger.info("邮件正文填写完成")
+            
+            # 上传附件
+            if filepath and os.path.exists(filepath):
+                file_input = self.driver.find_element(By.NAME, "attachment")
+                file_input.send_keys(filepath)
+                self.metrics.count('attachment_bytes', os.path.getsize(filepath))
+                self.logger.info(f"附件上传完成: {filepath}")
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"填写邮件内容失败: {str(e)}")
+            return False
+    
+    def fill_recipient(self, recipient=None):
+        """填写收件人，recipient 为空时填写全部收件人"""
+        recipients_input = self.waits.element('navigate', (By.NAME, "to"))
+        recipients_input.clear()
+        recipients_input.send_keys(recipient or ", ".join(EMAIL_CONFIG['recipients']))
+        self.logger.info("收件人填写完成")
+    
+    def form_intact(self, filepath):
+        """写邮件表单仍保留已填写的主题和附件（未被页面脚本清空，也未离开写邮件页面）"""
+        try:
+            if self.driver.find_element(By.NAME, "subject").get_attribute("value") != self.compose_subject:
+                return False
+            if filepath:
+                # 文件框的值为浏览器给出的路径（如 C:\fakepath\文件名），只比较文件名
+                value = self.driver.find_element(By.NAME, "attachment").get_attribute("value") or ''
+                return value.replace('\\', '/').endswith(os.path.basename(filepath))
+            return True
+        except WebDriverException:
+            return False
+    
+    def target_result_frame(self, send_button):
+        """重建隐藏的结果iframe并让表单提交到其中，清除上一封邮件的发送结果"""
+        self.driver.execute_script("""
+            var frame = document.getElementsByName(arguments[1])[0];
+            if (frame) { frame.parentNode.removeChild(frame); }
+            frame = document.createElement('iframe');
+            frame.name = arguments[1];
+            frame.style.display = 'none';
+            document.body.appendChild(frame);
+            if (arguments[0].form) { arguments[0].form.target = arguments[1]; }
+        """, send_button, RESULT_FRAME)
+    
+    def send_result(self, stale):
+        """等待条件：出现新的发送结果提示时返回 (是否成功, 提示文字)
+
+        先查找写邮件页面本身（由页面脚本提交表单的OA），再查找结果iframe；
+        stale 为点击发送前页面上已有的提示元素。
+        """
+        def condition(driver):
+            result = find_banner(driver, stale)
+            if result or not driver.find_elements(By.NAME, RESULT_FRAME):
+                return result
+            driver.switch_to.frame(RESULT_FRAME)
+            try:
+                if driver.find_elements(By.NAME, "password"):
+                    return False, SESSION_EXPIRED
+                return find_banner(driver)
+            finally:
+                driver.switch_to.default_content()
+        return condition
+    
+    def send_email(self):
+        """发送邮件，返回 (是否成功, 失败原因)
+
+        表单提交到隐藏的结果iframe，写邮件页面和已选择的附件保留，下一个收件人只需修改收件人。
+        """
+        try:
+            self.logger.info("开始发送邮件")
+            
+            # 点击发送按钮
+            send_button = self.waits.element(
+                'send', (By.XPATH, "//button[contains(text(),'发送') or contains(text(),'Send')]"), clickable=True
+            )
+            stale = {banner.id for locator in (SUCCESS_BANNER, ERROR_BANNER) for banner in self.driver.find_elements(*locator)}
+            self.target_result_frame(send_button)
+            send_button.click()
+            
+            # 等待成功或失败提示出现（根据实际OA系统调整）
+            success, message = self.waits.until('send', self.send_result(stale), "发送结果提示")
+            
+            if success:
+                self.logger.info("邮件发送成功")
+                return True, None
+            else:
+                self.logger.error(f"邮件发送失败: {message}")
+                return False, message or "未出现发送成功提示"
+                
+        except Exception as e:
+            self.logger.error(f"发送邮件失败: {str(e)}")
+            return False, "未出现发送成功提示"
+    
+    def prepare_session(self):
+        """启动浏览器并登录OA系统，不依赖报表文件，可与数据提取并行执行
+
+        浏览器已打开且仍在登录状态时直接复用；新启动的浏览器优先用保存的Cookie恢复会话，
+        Cookie失效时才填写登录表单。
+        """
+        try:
+            if self.driver_alive():
+                if not self.on_login_page():
+                    self.logger.info("复用已打开的浏览器会话")
+                    return True
+            else:
+                # 设置浏览器驱动
+                with self.metrics.phase('browser_launch'):
+                    if not self.setup_driver():
+                        return False
+            
+            # 恢复会话或登录OA系统
+            with self.metrics.phase('oa_login'):
+                if not self.restore_cookies() and not self.login_oa_system():
+                    return False
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"浏览器启动或登录失败: {str(e)}")
+            return False
+    
+    def open_compose(self):
+        """进入写邮件页面；会话已失效被跳转到登录页时重新登录一次再进入"""
+        if self.navigate_to_email():
+            return True
+        if not self.on_login_page():
+            return False
+        
+        self.logger.info("OA会话已失效，重新登录")
+        with self.metrics.phase('oa_login'):
+            if not self.login_oa_system():
+                return False
+        return self.navigate_to_email()
+    
+    def deliver(self, recipient, filepath=None, part=None, notice=None):
+        """在当前会话中向一个收件人发送一封邮件，返回 (是否成功, 失败原因, 重新打开原因)
+
+        同一附件的后续收件人复用已填写的写邮件表单，只修改收件人，附件只上传一次；
+        上次发送失败或表单已被重置时才重新打开写邮件页面并重新上传，原因记入投递报告。
+        提交时会话已失效（结果iframe中出现登录页）则重新登录，重新打开写邮件页面后重试一次。
+        """
+        success, error, reopened = self.deliver_once(recipient, filepath, part, notice)
+        if success or error != SESSION_EXPIRED:
+            return success, error, reopened
+        
+        self.logger.info("发送时OA会话已失效，重新登录后重试")
+        with self.metrics.phase('oa_login'):
+            if not self.login_oa_system():
+                return False, "重新登录失败", reopened
+        success, error, _ = self.deliver_once(recipient, filepath, part, notice)
+        return success, error, SESSION_EXPIRED
+    
+    def deliver_once(self, recipient, filepath=None, part=None, notice=None):
+        """deliver 的一次发送尝试，返回值同 deliver"""
+        form = (filepath, part, notice)
+        reopened = None
+        
+        if form == self.compose_form and self.form_intact(filepath):
+            try:
+                self.fill_recipient(recipient)
+            except Exception as e:
+                self.logger.error(f"填写收件人失败: {str(e)}")
+                self.compose_form, self.failed_form = None, form
+                return False, "填写收件人失败", reopened
+        else:
+            if form == self.compose_form:
+                reopened = "写邮件表单已被重置"
+            elif form == self.failed_form:
+                reopened = "上次发送失败"
+            if reopened:
+                self.logger.info(f"{reopened}，重新打开写邮件页面并重新上传附件")
+                self.metrics.count('compose_reopened')
+            self.compose_form = None
+            
+            # 进入写邮件页面（已知地址时直接打开）
+            with self.metrics.phase('oa_navigate'):
+                if not self.open_compose():
+                    self.failed_form = form
+                    return False, "进入写邮件页面失败", reopened
+            
+            # 填写邮件内容（含附件上传）
+            with self.metrics.phase('oa_upload'):
+                if not self.fill_email_content(filepath, part, notice, recipient):
+                    self.failed_form = form
+                    return False, "填写邮件内容失败", reopened
+            self.compose_form, self.failed_form = form, None
+        
+        # 发送邮件
+        with self.metrics.phase('oa_send'):
+            success, error = self.send_email()
+        if not success:
+            self.compose_form, self.failed_form = None, form
+            return False, error, reopened
+        
+        self.metrics.count('emails_sent')
+        return True, None, reopened
+    
+    def send_files(self, filepaths):
+        """在已登录的会话中逐个发送附件，每个附件逐个发送给每个收件人，结果保存在 self.report 中
+
+        OA写邮件页面只有一个附件框，多个文件时逐个发送，主题中标注序号。
+        """
+        return send_to_recipients(self, filepaths)
+    
+    def send_notice(self, message):
+        """在已登录的会话中向每个收件人发送一封无附件的提示邮件"""
+        return send_to_recipients(self, [None], notice=message)
+    
+    def close(self):
+        """关闭浏览器"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except WebDriverException as e:
+                self.logger.warning(f"关闭浏览器失败: {str(e)}")
+            self.driver = None
+            self.compose_form = None
+            self.logger.info("浏览器已关闭")
+    
+    def send_email_with_attachment(self, filepaths):
+        """完整的邮件发送流程：启动浏览器、登录、发送，最后关闭浏览器
+
+        filepaths 可以是单个文件路径或文件路径列表。persistent 为真时不关闭浏览器，
+        下次调用直接复用已登录的会话，需在不再发送时调用 close()。
+        """
+        try:
+            self.logger.info("开始邮件发送流程")
+            
+            if not self.prepare_session():
+                return False
+            
+            if not self.send_files(filepaths):
+                return False
+            
+            self.logger.info("邮件发送流程完成")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"邮件发送流程失败: {str(e)}")
+            return False
+        
+        finally:
+            if not self.persistent:
+                self.close()
+    
+    def test_oa_connection(self):
+        """测试OA系统连接"""
+        try:
+            if not self.setup_driver():
+                return False
+            
+            self.driver.get(EMAIL_CONFIG['oa_url'])
+            self.waits.page_ready()
+            
+            if "login" in self.driver.current_url or "登录" in self.driver.page_source:
+                self.logger.info("OA系统连接测试成功")
+                return True
+            else:
+                self.logger.error("OA系统连接测试失败")
+                return False
+                
+        except Exception as e:
+            self.logger.error(f"OA系统连接测试失败: {str(e)}")
+            return False
+        
+        finally:
+            self.close()
+
+def main():
+    """主函数 - 用于测试"""
+    sender = EmailSender()
+    
+    # 测试OA系统连接
+    if sender.test_oa_connection():
+        print("OA系统连接测试通过")
+        
+        # 测试邮件发送（需要提供文件路径）
+        test_filepath = "D:\\data_reports\\test_file.xlsx"
+        if os.path.exists(test_filepath):
+            if sender.send_email_with_attachment(test_filepath):
+                print("邮件发送测试成功")
+            else:
+                print("邮件发送测试失败")
+        else:
+            print(f"测试文件不存在: {test_filepath}")
+    else:
+        print("OA系统连接测试失败")
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+OA邮箱测试数据生成脚本
+向 oa_mail.db 批量写入大量用户和邮件，用于在接近生产规模的数据量下测试
+/inbox、/sent、/email/<id> 等页面的性能
+
+写入期间放宽 journal_mode / synchronous，分批 executemany 并在大事务中提交，
+完成后恢复为默认设置。收发件人按偏斜分布抽样，admin 等靠前的账号邮件最多。
+
+用法:
+    python generate_oa_mailbox.py                                  # 5000个用户、100万封邮件
+    python generate_oa_mailbox.py --users 20000 --emails 5000000
+"""
+
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+import numpy as np
+from simple_oa_mail import init_db
+
+SUBJECTS = ["数据报表", "会议通知", "工作周报", "请假申请", "系统维护通知", "培训安排", "值班表", "采购审批"]
+BODY_LINES = [
+    "您好！",
+    "附件为本期数据，请查收。",
+    "请于本周五前反馈意见。",
+    "如有疑问请联系信息科。",
+    "此邮件为系统自动发送，请勿回复。"
+]
+
+
+def relax_pragmas(conn):
+    """批量写入期间关闭回滚日志同步，换取写入速度（写入中断时需重新生成）"""
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-200000")
+
+
+def restore_pragmas(conn):
+    """恢复SQLite默认的日志和同步设置"""
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("PRAGMA synchronous=FULL")
+
+
+def insert_users(conn, count):
+    """批量写入测试用户，返回全部用户ID（按ID排序）"""
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (username, password, email) VALUES (?, ?, ?)",
+        ((f"test_user_{i:06d}", "user123", f"test_user_{i:06d}@oa.com") for i in range(1, count + 1))
+    )
+    conn.commit()
+    return np.array([row[0] for row in conn.execute("SELECT id FROM users ORDER BY id")])
+
+
+def generate_emails(rng, user_ids, count, days):
+    """生成 count 封邮件的行元组列表
+
+    收件人和发件人按 1/排名 的偏斜分布抽样，ID越小的用户（admin、user1 等）邮件越多。
+    """
+    ranks = np.arange(1, len(user_ids) + 1)
+    weights = 1.0 / ranks
+    weights /= weights.sum()
+
+    recipients = user_ids[rng.choice(len(user_ids), size=count, p=weights)]
+    senders = user_ids[rng.choice(len(user_ids), size=count, p=weights)]
+
+    subjects = np.array(SUBJECTS)[rng.integers(0, len(SUBJECTS), size=count)]
+    serials = rng.integers(1, 100000, size=count)
+
+    # 正文长度不等：随机取若干行
+    line_counts = rng.integers(1, len(BODY_LINES) + 1, size=count)
+    bodies = ["\n".join(BODY_LINES[:n]) for n in line_counts.tolist()]
+
+    # 约一成邮件带附件
+    has_attachment = rng.random(count) < 0.1
+
+    now = np.datetime64(datetime.now().replace(microsecond=0), 's')
+    created = (now - rng.integers(0, days * 86400, size=count).astype('timedelta64[s]'))
+    created_at = np.datetime_as_string(created).tolist()
+
+    return [
+        (
+            int(sender),
+            int(recipient),
+            f"{subject} #{serial}",
+            body,
+            f"report_{serial}.xlsx" if attachment else None,
+            timestamp.replace('T', ' ')
+        )
+        for sender, recipient, subject, serial, body, attachment, timestamp in zip(
+            senders.tolist(), recipients.tolist(), subjects.tolist(), serials.tolist(),
+            bodies, has_attachment.tolist(), created_at
+        )
+    ]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="为 oa_mail.db 生成大量用户和邮件")
+    parser.add_argument('--db', default='oa_mail.db', help="数据库文件，默认 oa_mail.db")
+    parser.add_argument('--users', type=int, default=5000, help="生成的用户数，默认 5000")
+    parser.add_argument('--emails', type=int, default=1000000, help="生成的邮件数，默认 1000000")
+    parser.add_argument('--days', type=int, default=365, help="邮件时间分布的天数，默认 365")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子，默认 42")
+    parser.add_argument('--batch-size', type=int, default=50000, help="每次 executemany 的行数，默认 50000")
+    parser.add_argument('--commit-every', type=int, default=20, help="每多少批提交一次，默认 20")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    # 建表并写入默认账号
+    init_db(args.db)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        relax_pragmas(conn)
+        start = time.perf_counter()
+
+        user_ids = insert_users(conn, args.users)
+        print(f"✓ 用户数: {len(user_ids)}")
+
+        inserted = 0
+        batch_index = 0
+        while inserted < args.emails:
+            rows = generate_emails(rng, user_ids, min(args.batch_size, args.emails - inserted), args.days)
+            conn.executemany(
+                "INSERT INTO emails (sender_id, recipient_id, subject, body, attachment_path, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            inserted += len(rows)
+            batch_index += 1
+            if batch_index % args.commit_every == 0:
+                conn.commit()
+                print(f"  已写入 {inserted} 封邮件")
+        conn.commit()
+
+        elapsed = time.perf_counter() - start
+        print(f"✓ 写入 {inserted} 封邮件，用时 {elapsed:.1f} 秒（{inserted / max(elapsed, 1e-9):.0f} 封/秒）")
+
+    finally:
+        restore_pragmas(conn)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP邮件发送模块
+不启动浏览器，直接向OA系统的 /login 和 /compose 表单提交请求发送邮件，
+接口与 EmailSender 相同；需要执行页面脚本的OA系统仍使用 EmailSender
+"""
+
+import os
+import re
+import io
+import uuid
+import logging
+import requests
+from config import EMAIL_CONFIG, WAIT_CONFIG
+from email_sender import build_subject, build_body
+from run_metrics import RunMetrics
+from delivery_report import send_to_recipients
+
+# OA页面上的提示信息（flash），第一组为类别（success / error / info），第二组为提示文字
+FLASH_PATTERN = re.compile(r'<div class="flash (\w+)">(.*?)</div>', re.S)
+
+
+class MultipartBody:
+    """multipart/form-data 请求体
+
+    附件按块从磁盘读取，不整体载入内存；长度预先计算，请求以 Content-Length 发送。
+    """
+
+    def __init__(self, fields, file_field=None, filepath=None, chunk_size=1024 * 1024):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+
+        head = io.BytesIO()
+        for name, value in fields.items():
+            head.write(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode('utf-8'))
+            head.write(f'{value}\r\n'.encode('utf-8'))
+
+        self.file = None
+        file_size = 0
+        if filepath:
+            filename = os.path.basename(filepath).replace('"', '%22')
+            head.write((
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n'
+            ).encode('utf-8'))
+            self.file = open(filepath, 'rb')
+            file_size = os.path.getsize(filepath)
+        # 附件内容之后需要换行再接结束分隔符
+        tail = (b'\r\n' if filepath else b'') + f'--{self.boundary}--\r\n'.encode('utf-8')
+
+        head = head.getvalue()
+        self.length = len(head) + file_size + len(tail)
+        self.segments = [io.BytesIO(head)] + ([self.file] if self.file else []) + [io.BytesIO(tail)]
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size=-1):
+        """依次读取表单字段、附件内容和结束分隔符"""
+        size = self.chunk_size if size is None or size < 0 else size
+        while self.segments:
+            data = self.segments[0].read(size)
+            if data:
+                return data
+            self.segments.pop(0)
+        return b''
+
+    def __iter__(self):
+        while True:
+            data = self.read(self.chunk_size)
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+class HttpEmailSender:
+    """基于HTTP表单提交的邮件发送器
+
+    登录一次后在同一个 requests.Session 中发送，连接保持复用；
+    每个收件人一封邮件（OA写邮件表单只有一个收件人），发送结果从跳转后的提示信息判断。
+    """
+
+    def __init__(self, metrics=None):
+        self.session = None
+        self.logger = logging.getLogger(__name__)
+        self.base_url = EMAIL_CONFIG['oa_url'].rstrip('/')
+        self.timeouts = WAIT_CONFIG['timeouts']
+
+        # 登录、上传等阶段的耗时指标
+        self.metrics = metrics or RunMetrics('email')
+
+        # 最近一次 send_files / send_notice 的逐收件人投递结果
+        self.report = None
+
+    def timeout(self, step):
+        """请求的超时时间（秒），与浏览器等待共用 WAIT_CONFIG 中的步骤超时"""
+        return self.timeouts.get(step, self.timeouts['default'])
+
+    def read_flash(self, response):
+        """从页面中读取第一条提示信息，返回 (类别, 文字)，没有时返回 (None, None)"""
+        match = FLASH_PATTERN.search(response.text)
+        if not match:
+            return None, None
+        return match.group(1), match.group(2).strip()
+
+    def login_oa_system(self):
+        """提交登录表单，成功后跳转到收件箱"""
+        try:
+            self.logger.info("开始登录OA系统")
+            response = self.session.post(
+                f"{self.base_url}/login",
+                data={'username': EMAIL_CONFIG['username'], 'password': EMAIL_CONFIG['password']},
+                timeout=self.timeout('login')
+            )
+            response.raise_for_status()
+
+            if response.history and '/login' not in response.url:
+                self.logger.info("OA系统登录成功")
+                return True
+
+            _, message = self.read_flash(response)
+            self.logger.error(f"OA系统登录失败: {message or '未跳转到收件箱'}")
+            return False
+
+        except Exception as e:
+            self.logger.error(f"登录OA系统失败: {str(e)}")
+            return False
+
+    def prepare_session(self):
+        """创建HTTP会话并登录OA系统，已登录时直接复用"""
+        try:
+            if self.session is not None:
+                self.logger.info("复用已登录的HTTP会话")
+                return True
+
+            self.session = requests.Session()
+            with self.metrics.phase('oa_login'):
+                if not self.login_oa_system():
+                    self.close()
+                    return False
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"OA登录失败: {str(e)}")
+            return False
+
+    def post_compose(self, recipient, subject, body, filepath=None):
+        """提交一次写邮件表单，返回最终页面的响应"""
+        multipart = MultipartBody(
+            {'recipient': recipient, 'subject': subject, 'body': body},
+            'attachment', filepath
+        )
+        try:
+            return self.session.post(
+                f"{self.base_url}/compose",
+                data=multipart,
+                headers={'Content-Type': multipart.content_type},
+                timeout=self.timeout('send')
+            )
+        finally:
+            multipart.close()
+
+    def deliver(self, recipient, filepath=None, part=None, notice=None):
+        """向一个收件人发送一封邮件，返回 (是否成功, 失败原因, 重新打开原因)
+
+        会话失效被跳转到登录页时重新登录一次再发送。每封邮件都单独提交表单和附件，
+        没有可复用的写邮件页面，重新打开原因始终为 None。
+        """
+        subject = build_subject(part, notice)
+        body = build_body(notice)
+
+        with self.metrics.phase('oa_send'):
+            response = self.post_compose(recipient, subject, body, filepath)
+            if '/login' in response.url:
+                self.logger.info("OA会话已失效，重新登录")
+                if not self.login_oa_system():
+                    return False, "重新登录失败", None
+                response = self.post_compose(recipient, subject, body, filepath)
+        response.raise_for_status()
+
+        category, message = self.read_flash(response)
+        if category != 'success':
+            self.logger.error(f"发送给 {recipient} 的邮件发送失败: {message or '未找到发送结果提示'}")
+            return False, message or "未找到发送结果提示", None
+
+        if filepath:
+            self.metrics.count('attachment_bytes', os.path.getsize(filepath))
+        self.metrics.count('emails_sent')
+        self.logger.info(f"发送给 {recipient} 的邮件发送成功")
+        return True, None, None
+
+    def send_files(self, filepaths):
+        """在已登录的会话中逐个发送附件，每个附件逐个发送给每个收件人，结果保存在 self.report 中"""
+        return send_to_recipients(self, filepaths)
+
+    def send_notice(self, message):
+        """在已登录的会话中向每个收件人发送一封无附件的提示邮件"""
+        return send_to_recipients(self, [None], notice=message)
+
+    def close(self):
+        """关闭HTTP会话"""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def send_email_with_attachment(self, filepaths):
+        """完整的邮件发送流程：登录、发送，最后关闭会话"""
+        try:
+            self.logger.info("开始邮件发送流程")
+
+            if not self.prepare_session():
+                return False
+
+            if not self.send_files(filepaths):
+                return False
+
+            self.logger.info("邮件发送流程完成")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"邮件发送流程失败: {str(e)}")
+            return False
+
+        finally:
+            self.close()
+
+    def test_oa_connection(self):
+        """测试OA系统连接：登录页可以访问"""
+        try:
+            response = requests.get(f"{self.base_url}/login", timeout=self.timeout('page_load'))
+            if response.ok and 'name="username"' in response.text:
+                self.logger.info("OA系统连接测试成功")
+                return True
+            self.logger.error(f"OA系统连接测试失败: HTTP {response.status_code}")
+            return False
+
+        except Exception as e:
+            self.logger.error(f"OA系统连接测试失败: {str(e)}")
+            return False
@@ -1,89 +1,198 @@
-# -*- coding: utf-8 -*-
-"""
-自动生成门诊记录并插入Oracle数据库
-"""
-import oracledb
-import random
-from datetime import datetime, timedelta
-from config import DATABASE_CONFIG
-
-# 随机数据生成函数
-NAMES = ["张三", "李四", "王五", "赵六", "孙七", "周八", "吴九", "郑十", "钱一", "冯二", "陈三", "褚四", "卫五", "蒋六", "沈七", "韩八", "杨九", "朱十", "秦一", "尤二"]
-GENDERS = ["男", "女"]
-DEPARTMENTS = ["内科", "外科", "儿科", "妇科", "骨科"]
-DIAGNOSES = ["感冒", "高血压", "糖尿病", "骨折", "胃炎", "头痛"]
-DOCTORS = ["医生A", "医生B", "医生C", "医生D", "医生E", "医生F", "医生G", "医生H", "医生I", "医生J"]
-
-def random_date():
-    days_ago = random.randint(0, 365)
-    return (datetime.now() - timedelta(days=days_ago)).date()
-
-def generate_record(i):
-    return {
-        "ID": i,
-        "PATIENT_NAME": random.choice(NAMES) + random.choice(["", "明", "华", "强", "丽", "娜"]),
-        "GENDER": random.choice(GENDERS),
-        "AGE": random.randint(1, 90),
-        "VISIT_DATE": random_date(),
-        "DEPARTMENT": random.choice(DEPARTMENTS),
-        "DIAGNOSIS": random.choice(DIAGNOSES),
-        "DOCTOR": random.choice(DOCTORS)
-    }
-
-def create_table(conn):
-    sql = '''
-    CREATE TABLE OUTPATIENT_RECORDS (
-        ID           NUMBER(8) PRIMARY KEY,
-        PATIENT_NAME VARCHAR2(20),
-        GENDER       VARCHAR2(2),
-        AGE          NUMBER(3),
-        VISIT_DATE   DATE,
-        DEPARTMENT   VARCHAR2(20),
-        DIAGNOSIS    VARCHAR2(50),
-        DOCTOR       VARCHAR2(20)
-    )'''
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute(sql)
-            print("✓ OUTPATIENT_RECORDS表创建成功")
-    except oracledb.DatabaseError as e:
-        if "ORA-00955" in str(e):
-            print("表已存在，跳过创建")
-        else:
-            print(f"建表失败: {e}")
-            raise
-
-def insert_records(conn, records):
-    sql = '''
-    INSERT INTO OUTPATIENT_RECORDS (ID, PATIENT_NAME, GENDER, AGE, VISIT_DATE, DEPARTMENT, DIAGNOSIS, DOCTOR)
-    VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
-    '''
-    data = [(
-        r["ID"], r["PATIENT_NAME"], r["GENDER"], r["AGE"], r["VISIT_DATE"], r["DEPARTMENT"], r["DIAGNOSIS"], r["DOCTOR"]
-    ) for r in records]
-    with conn.cursor() as cursor:
-        cursor.executemany(sql, data)
-    conn.commit()
-    print(f"✓ 成功插入{len(records)}条门诊记录")
-
-def main():
-    print("连接数据库...")
-    dsn = oracledb.makedsn(
-        DATABASE_CONFIG['host'],
-        DATABASE_CONFIG['port'],
-        service_name=DATABASE_CONFIG['service_name']
-    )
-    conn = oracledb.connect(
-        user=DATABASE_CONFIG['username'],
-        password=DATABASE_CONFIG['password'],
-        dsn=dsn
-    )
-    print("✓ 数据库连接成功")
-    create_table(conn)
-    records = [generate_record(i) for i in range(1, 101)]
-    insert_records(conn, records)
-    conn.close()
-    print("全部完成！")
-
-if __name__ == "__main__":
-    main() 
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""
+自动生成门诊记录并插入Oracle数据库
+按规模系数生成任意数量的测试数据：各列用NumPy整批生成（固定随机种子，结果可复现），
+科室、诊断等按偏斜分布抽样，分批 executemany 写入并定期提交，可多进程按ID区间并行写入
+
+用法:
+    python insert_outpatient_records.py                          # 插入100条（默认规模 0.001）
+    python insert_outpatient_records.py --scale 100 --workers 4  # 插入1000万条，4个进程并行
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import oracledb
+from db_pool import acquire_connection, close_pool
+
+# 规模系数 1 对应的记录数
+ROWS_PER_SCALE = 100000
+
+# 随机数据生成用的取值和权重（权重不必归一化）
+SURNAMES = ["张", "李", "王", "赵", "孙", "周", "吴", "郑", "钱", "冯", "陈", "褚", "卫", "蒋", "沈", "韩", "杨", "朱", "秦", "尤"]
+SURNAME_WEIGHTS = [10, 9, 9, 5, 4, 4, 4, 3, 2, 2, 8, 1, 1, 2, 2, 2, 6, 3, 1, 1]
+GIVEN_NAMES = ["", "明", "华", "强", "丽", "娜", "伟", "芳", "军", "敏", "静", "磊"]
+GENDERS = ["男", "女"]
+DEPARTMENTS = ["内科", "外科", "儿科", "妇科", "骨科"]
+DEPARTMENT_WEIGHTS = [40, 20, 18, 12, 10]
+DIAGNOSES = ["感冒", "高血压", "糖尿病", "骨折", "胃炎", "头痛"]
+# 各科室的诊断分布（行与 DEPARTMENTS 对应，列与 DIAGNOSES 对应）
+DIAGNOSIS_WEIGHTS = [
+    [30, 25, 20, 0, 15, 10],   # 内科
+    [10, 5, 5, 40, 20, 20],    # 外科
+    [70, 0, 2, 8, 10, 10],     # 儿科
+    [40, 15, 15, 2, 13, 15],   # 妇科
+    [5, 5, 5, 75, 2, 8],       # 骨科
+]
+# 每个科室固定两名医生，与 DEPARTMENTS 顺序对应
+DOCTORS = ["医生A", "医生B", "医生C", "医生D", "医生E", "医生F", "医生G", "医生H", "医生I", "医生J"]
+
+def probabilities(weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+def generate_batch(start_id, count, seed=42, today=None):
+    """生成ID从 start_id 开始的 count 条门诊记录，返回行元组列表
+
+    随机数发生器由 (seed, start_id) 确定，同一批次无论由哪个进程生成结果都相同。
+    """
+    rng = np.random.default_rng([seed, start_id])
+    today = today or datetime.now().date()
+
+    departments = rng.choice(len(DEPARTMENTS), size=count, p=probabilities(DEPARTMENT_WEIGHTS))
+
+    # 按科室的条件分布抽取诊断：逐行累计分布函数上做一次比较
+    cumulative = np.cumsum(probabilities(DIAGNOSIS_WEIGHTS), axis=1)[departments]
+    diagnoses = (rng.random((count, 1)) > cumulative[:, :-1]).sum(axis=1)
+
+    # 年龄：成人近似正态分布，儿科 0-14 岁
+    ages = np.clip(rng.normal(45, 18, size=count), 15, 95).astype(int)
+    pediatric = departments == DEPARTMENTS.index("儿科")
+    ages[pediatric] = rng.integers(0, 15, size=pediatric.sum())
+
+    # 性别：妇科全部为女性
+    genders = rng.integers(0, 2, size=count)
+    genders[departments == DEPARTMENTS.index("妇科")] = GENDERS.index("女")
+
+    surnames = rng.choice(len(SURNAMES), size=count, p=probabilities(SURNAME_WEIGHTS))
+    given_names = rng.integers(0, len(GIVEN_NAMES), size=count)
+    names = np.char.add(np.array(SURNAMES)[surnames], np.array(GIVEN_NAMES)[given_names])
+
+    doctors = departments * 2 + rng.integers(0, 2, size=count)
+
+    # 就诊日期：近一年，越近的日期就诊越多
+    days_ago = np.minimum(rng.exponential(120, size=count), 365).astype(int)
+    visit_dates = (np.datetime64(today) - days_ago.astype('timedelta64[D]')).astype('datetime64[s]').tolist()
+
+    return list(zip(
+        range(start_id, start_id + count),
+        names.tolist(),
+        np.array(GENDERS)[genders].tolist(),
+        ages.tolist(),
+        visit_dates,
+        np.array(DEPARTMENTS)[departments].tolist(),
+        np.array(DIAGNOSES)[diagnoses].tolist(),
+        np.array(DOCTORS)[doctors].tolist()
+    ))
+
+def create_table(conn):
+    sql = '''
+    CREATE TABLE OUTPATIENT_RECORDS (
+        ID           NUMBER(8) PRIMARY KEY,
+        PATIENT_NAME VARCHAR2(20),
+        GENDER       VARCHAR2(2),
+        AGE          NUMBER(3),
+        VISIT_DATE   DATE,
+        DEPARTMENT   VARCHAR2(20),
+        DIAGNOSIS    VARCHAR2(50),
+        DOCTOR       VARCHAR2(20)
+    )'''
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            print("✓ OUTPATIENT_RECORDS表创建成功")
+    except oracledb.DatabaseError as e:
+        if "ORA-00955" in str(e):
+            print("表已存在，跳过创建")
+        else:
+            print(f"建表失败: {e}")
+            raise
+
+INSERT_SQL = '''
+    INSERT INTO OUTPATIENT_RECORDS (ID, PATIENT_NAME, GENDER, AGE, VISIT_DATE, DEPARTMENT, DIAGNOSIS, DOCTOR)
+    VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
+'''
+
+def insert_range(start_id, end_id, seed=42, batch_size=10000, commit_every=10):
+    """生成并插入ID区间 [start_id, end_id) 的记录，每 commit_every 批提交一次，返回插入条数"""
+    conn = acquire_connection()
+    inserted = 0
+    try:
+        with conn.cursor() as cursor:
+            # 绑定类型固定，避免各批次因字符串长度不同而重新分配绑定缓冲区
+            cursor.setinputsizes(None, 20, 2, None, oracledb.DB_TYPE_DATE, 20, 50, 20)
+            for batch_index, batch_start in enumerate(range(start_id, end_id, batch_size), start=1):
+                rows = generate_batch(batch_start, min(batch_size, end_id - batch_start), seed)
+                cursor.executemany(INSERT_SQL, rows)
+                inserted += len(rows)
+                if batch_index % commit_every == 0:
+                    conn.commit()
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"✓ ID {start_id}-{end_id - 1} 插入 {inserted} 条门诊记录")
+    return inserted
+
+def split_ranges(start_id, row_count, workers, batch_size):
+    """把ID区间按批次边界切分给各进程，互不重叠"""
+    batches = -(-row_count // batch_size)
+    per_worker = -(-batches // workers)
+    end_id = start_id + row_count
+    ranges = []
+    for index in range(workers):
+        low = start_id + index * per_worker * batch_size
+        high = min(low + per_worker * batch_size, end_id)
+        if low < high:
+            ranges.append((low, high))
+    return ranges
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="生成门诊记录测试数据并插入Oracle数据库")
+    parser.add_argument('--scale', type=float, default=0.001, help=f"规模系数，1 对应 {ROWS_PER_SCALE} 条，默认 0.001（100条）")
+    parser.add_argument('--rows', type=int, help="直接指定记录数，优先于 --scale")
+    parser.add_argument('--start-id', type=int, default=1, help="起始ID，默认 1")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子，默认 42")
+    parser.add_argument('--batch-size', type=int, default=10000, help="每次 executemany 的行数，默认 10000")
+    parser.add_argument('--commit-every', type=int, default=10, help="每多少批提交一次，默认 10")
+    parser.add_argument('--workers', type=int, default=1, help="并行写入的进程数，默认 1")
+    return parser.parse_args()
+
+def main():
+    try:
+        run(parse_args())
+    finally:
+        # 多进程写入时各子进程的连接池随进程退出释放
+        close_pool()
+
+def run(args):
+    """建表并按参数生成、插入测试数据"""
+    row_count = args.rows if args.rows is not None else int(args.scale * ROWS_PER_SCALE)
+
+    print("连接数据库...")
+    conn = acquire_connection()
+    print("✓ 数据库连接成功")
+    create_table(conn)
+    conn.close()
+
+    print(f"生成并插入 {row_count} 条门诊记录（种子 {args.seed}，每批 {args.batch_size} 条，{args.workers} 个进程）...")
+    start = time.perf_counter()
+    ranges = split_ranges(args.start_id, row_count, max(1, args.workers), args.batch_size)
+
+    if len(ranges) <= 1:
+        inserted = sum(insert_range(low, high, args.seed, args.batch_size, args.commit_every) for low, high in ranges)
+    else:
+        # 每个进程使用自己的连接池和连接，写入互不重叠的ID区间
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(insert_range, low, high, args.seed, args.batch_size, args.commit_every)
+                for low, high in ranges
+            ]
+            inserted = sum(future.result() for future in futures)
+
+    elapsed = time.perf_counter() - start
+    print(f"✓ 成功插入{inserted}条门诊记录，用时 {elapsed:.1f} 秒（{inserted / max(elapsed, 1e-9):.0f} 条/秒）")
+    print("全部完成！")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+本地分析副本模块
+将配置的Oracle源表按增量列批量复制到本地SQLite数据库，
+报表查询可改为在副本上执行，生产库只承担定期的批量读取
+
+用法:
+    python local_replica.py          # 同步全部配置的表
+"""
+
+import os
+import sys
+import time
+import logging
+import sqlite3
+from datetime import datetime
+import oracledb
+from config import REPLICA_CONFIG
+from db_pool import acquire_connection
+import sqlite_adapter  # 注册 datetime 与 DATE 列的转换
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('local_replica.log', encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+
+# 副本中记录各表同步状态的表
+STATE_TABLE = '_REPLICA_STATE'
+
+
+def sqlite_type(column):
+    """根据Oracle列描述确定副本中的列类型，DATE 列读出时还原为 datetime"""
+    type_code = column[1]
+    if type_code in (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP):
+        return 'DATE'
+    if type_code is oracledb.DB_TYPE_NUMBER:
+        # 描述中第5、6项为精度和小数位数。小数位数-127：未限定精度的 NUMBER（精度0或None）
+        # 可能存放整数也可能存放小数，用 NUMERIC 亲和性按值保存；带精度的是 FLOAT(p)。
+        # 其余小数位数不大于0的为整数，大于0的才是小数
+        precision, scale = column[4], column[5]
+        if scale == -127:
+            return 'REAL' if precision else 'NUMERIC'
+        return 'REAL' if scale and scale > 0 else 'INTEGER'
+    if type_code in (oracledb.DB_TYPE_BINARY_DOUBLE, oracledb.DB_TYPE_BINARY_FLOAT):
+        return 'REAL'
+    return 'TEXT'
+
+
+class LocalReplica:
+    """源表的本地SQLite副本
+
+    每张表按增量列复制：只读取增量列不小于副本当前最大值的行，按主键覆盖写入。
+    边界值的行会被重复读取一次，保证同一时间戳下后提交的行不会遗漏。
+    每张表的一次同步在一个事务中完成，报表查询只会看到完整的同步结果。
+    """
+
+    def __init__(self, db_path=None, batch_size=None, metrics=None, connection_factory=None):
+        self.db_path = db_path or REPLICA_CONFIG['db_path']
+        self.batch_size = batch_size or REPLICA_CONFIG.get('batch_size', 10000)
+        self.metrics = metrics
+        self.connection_factory = connection_factory or acquire_connection
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+
+    def open_replica(self):
+        """打开副本数据库，WAL模式下同步期间报表查询仍可读取"""
+        connection = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                TABLE_NAME TEXT PRIMARY KEY,
+                SYNCED_AT DATE,
+                ROW_COUNT INTEGER
+            )
+        """)
+        return connection
+
+    def replica_columns(self, replica, name):
+        """副本中已有表的列名，表不存在时返回 None"""
+        rows = replica.execute(f"PRAGMA table_info({name})").fetchall()
+        return [row[1] for row in rows] or None
+
+    def create_table(self, replica, table, description):
+        """按源表的列描述在副本中建表"""
+        name = table['name']
+        columns = ",\n".join(f"    {column[0]} {sqlite_type(column)}" for column in description)
+        replica.execute(f"CREATE TABLE {name} (\n{columns},\n    PRIMARY KEY ({table['key_column']})\n)")
+        incremental = table.get('incremental_column', table['key_column'])
+        if incremental.upper() != table['key_column'].upper():
+            replica.execute(f"CREATE INDEX IX_{name}_{incremental} ON {name} ({incremental})")
+        self.logger.info(f"副本中已创建表 {name}（{len(description)} 列）")
+
+    def get_watermark(self, replica, table):
+        """副本中增量列的当前最大值（按列类型读出），空表返回 None"""
+        incremental = table.get('incremental_column', table['key_column'])
+        row = replica.execute(
+            f"SELECT {incremental} FROM {table['name']} ORDER BY {incremental} DESC LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def sync_table(self, table):
+        """同步一张表，返回本次复制的行数"""
+        name = table['name']
+        incremental = table.get('incremental_column', table['key_column'])
+        start = time.perf_counter()
+
+        replica = self.open_replica()
+        source = self.connection_factory()
+        try:
+            columns = self.replica_columns(replica, name)
+            watermark = self.get_watermark(replica, table) if columns else None
+
+            # 已有副本时按副本的列顺序读取，避免源表新增列导致错位
+            select_list = ', '.join(columns) if columns else '*'
+            if watermark is None:
+                sql = f"SELECT {select_list} FROM {name} ORDER BY {incremental}"
+                params = None
+                self.logger.info(f"副本表 {name} 全量复制")
+            else:
+                sql = f"SELECT {select_list} FROM {name} WHERE {incremental} >= :watermark ORDER BY {incremental}"
+                params = {'watermark': watermark}
+                self.logger.info(f"副本表 {name} 增量复制，{incremental} >= {watermark}")
+
+            cursor = source.cursor()
+            cursor.arraysize = self.batch_size
+            cursor.prefetchrows = self.batch_size + 1
+            cursor.execute(sql, params)
+
+            if columns is None:
+                self.create_table(replica, table, cursor.description)
+                columns = [column[0] for column in cursor.description]
+
+            insert_sql = (
+                f"INSERT OR REPLACE INTO {name} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})"
+            )
+
+            # 整张表的本次同步在一个事务内完成
+            count = 0
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                replica.executemany(insert_sql, rows)
+                count += len(rows)
+            cursor.close()
+
+            replica.execute(
+                f"INSERT OR REPLACE INTO {STATE_TABLE} (TABLE_NAME, SYNCED_AT, ROW_COUNT) "
+                f"VALUES (?, ?, (SELECT COUNT(*) FROM {name}))",
+                (name, datetime.now())
+            )
+            replica.commit()
+
+        except Exception:
+            replica.rollback()
+            raise
+
+        finally:
+            source.close()
+            replica.close()
+
+        elapsed = time.perf_counter() - start
+        if self.metrics is not None:
+            self.metrics.add_time('replica_sync', elapsed)
+            self.metrics.count('replica_rows', count)
+        self.logger.info(f"副本表 {name} 同步完成，复制 {count} 行，用时 {elapsed:.2f} 秒")
+        return count
+
+    def sync_all(self):
+        """同步全部配置的表，任一表失败时返回 False"""
+        success = True
+        for table in REPLICA_CONFIG['tables']:
+            try:
+                self.sync_table(table)
+            except Exception as e:
+                self.logger.error(f"副本表 {table['name']} 同步失败: {str(e)}")
+                success = False
+        return success
+
+    def last_synced_at(self):
+        """全部配置的表中最早的一次同步时间，有表从未同步时返回 None"""
+        if not os.path.exists(self.db_path):
+            return None
+        replica = self.open_replica()
+        try:
+            synced = dict(replica.execute(f"SELECT TABLE_NAME, SYNCED_AT FROM {STATE_TABLE}").fetchall())
+        finally:
+            replica.close()
+        times = [synced.get(table['name']) for table in REPLICA_CONFIG['tables']]
+        if not times or None in times:
+            return None
+        return min(times)
+
+    def is_stale(self, max_age_minutes=None):
+        """副本是否超过允许的时长未同步"""
+        max_age_minutes = max_age_minutes or REPLICA_CONFIG.get('max_age_minutes', 1440)
+        synced_at = self.last_synced_at()
+        return synced_at is None or (datetime.now() - synced_at).total_seconds() > max_age_minutes * 60
+
+
+def main():
+    """主函数 - 同步全部配置的表"""
+    replica = LocalReplica()
+    if replica.sync_all():
+        print(f"副本同步完成: {replica.db_path}")
+        return 0
+    print("副本同步失败，详见 local_replica.log")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
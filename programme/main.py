@@ -1,167 +1,310 @@
-# -*- coding: utf-8 -*-
-"""
-主程序
-整合数据提取和邮件发送功能
-"""
-
-import logging
-import sys
-from datetime import datetime
-from database_extractor import DatabaseExtractor
-from email_sender import EmailSender
-from config import ensure_output_dir
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('main.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-class AutomationSystem:
-    """自动化系统主类"""
-    
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self.database_extractor = DatabaseExtractor()
-        self.email_sender = EmailSender()
-        
-    def run_full_process(self):
-        """运行完整的自动化流程"""
-        try:
-            self.logger.info("=" * 50)
-            self.logger.info("开始执行自动化数据提取与邮件发送流程")
-            self.logger.info("=" * 50)
-            
-            # 步骤1: 数据提取
-            self.logger.info("步骤1: 开始数据提取")
-            filepath = self.database_extractor.extract_and_save()
-            
-            if not filepath:
-                self.logger.error("数据提取失败，流程终止")
-                return False
-            
-            self.logger.info(f"数据提取成功，文件路径: {filepath}")
-            
-            # 步骤2: 邮件发送
-            self.logger.info("步骤2: 开始邮件发送")
-            email_success = self.email_sender.send_email_with_attachment(filepath)
-            
-            if email_success:
-                self.logger.info("邮件发送成功")
-                self.logger.info("=" * 50)
-                self.logger.info("自动化流程执行完成")
-                self.logger.info("=" * 50)
-                return True
-            else:
-                self.logger.error("邮件发送失败")
-                return False
-                
-        except Exception as e:
-            self.logger.error(f"自动化流程执行失败: {str(e)}")
-            return False
-    
-    def test_system(self):
-        """测试系统各组件"""
-        self.logger.info("开始系统测试")
-        
-        # 测试数据库连接
-        self.logger.info("测试数据库连接...")
-        if self.database_extractor.test_connection():
-            self.logger.info("✓ 数据库连接测试通过")
-        else:
-            self.logger.error("✗ 数据库连接测试失败")
-            return False
-        
-        # 测试OA系统连接
-        self.logger.info("测试OA系统连接...")
-        if self.email_sender.test_oa_connection():
-            self.logger.info("✓ OA系统连接测试通过")
-        else:
-            self.logger.error("✗ OA系统连接测试失败")
-            return False
-        
-        self.logger.info("✓ 系统测试完成")
-        return True
-    
-    def run_test_extraction(self):
-        """运行测试数据提取"""
-        self.logger.info("运行测试数据提取")
-        filepath = self.database_extractor.extract_and_save()
-        
-        if filepath:
-            self.logger.info(f"测试数据提取成功: {filepath}")
-            return filepath
-        else:
-            self.logger.error("测试数据提取失败")
-            return None
-
-def print_usage():
-    """打印使用说明"""
-    print("""
-自动化数据提取与邮件发送系统
-
-使用方法:
-    python main.py [选项]
-
-选项:
-    --test        运行系统测试
-    --extract     仅运行数据提取测试
-    --run         运行完整自动化流程
-    --help        显示此帮助信息
-
-示例:
-    python main.py --test      # 测试系统连接
-    python main.py --extract   # 测试数据提取
-    python main.py --run       # 运行完整流程
-    """)
-
-def main():
-    """主函数"""
-    # 确保输出目录存在
-    ensure_output_dir()
-    
-    # 创建自动化系统实例
-    system = AutomationSystem()
-    
-    # 解析命令行参数
-    if len(sys.argv) < 2:
-        print_usage()
-        return
-    
-    command = sys.argv[1].lower()
-    
-    if command == "--test":
-        print("运行系统测试...")
-        if system.test_system():
-            print("系统测试通过")
-        else:
-            print("系统测试失败")
-    
-    elif command == "--extract":
-        print("运行数据提取测试...")
-        filepath = system.run_test_extraction()
-        if filepath:
-            print(f"数据提取测试成功: {filepath}")
-        else:
-            print("数据提取测试失败")
-    
-    elif command == "--run":
-        print("运行完整自动化流程...")
-        if system.run_full_process():
-            print("自动化流程执行成功")
-        else:
-            print("自动化流程执行失败")
-    
-    elif command == "--help":
-        print_usage()
-    
-    else:
-        print(f"未知命令: {command}")
-        print_usage()
-
-if __name__ == "__main__":
+# -*- coding: utf-8 -*-
+"""
+主程序
+整合数据提取和邮件发送功能
+"""
+
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from database_extractor import DatabaseExtractor
+from async_extractor import AsyncDatabaseExtractor
+from local_replica import LocalReplica
+from email_sender import EmailSender
+from http_email_sender import HttpEmailSender
+from run_metrics import RunMetrics
+from db_pool import close_pool
+from config import ensure_output_dir, EMAIL_CONFIG, METRICS_CONFIG, QUERY_CONFIG, FINGERPRINT_CONFIG, REPLICA_CONFIG
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('main.log', encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+
+class AutomationSystem:
+    """自动化系统主类"""
+    
+    def __init__(self, use_cache=True, params=None):
+        self.logger = logging.getLogger(__name__)
+        # async_mode 时报表查询以协程并发执行，对外仍是同步的 extract_and_save
+        extractor_class = AsyncDatabaseExtractor if QUERY_CONFIG.get('async_mode') else DatabaseExtractor
+        self.database_extractor = extractor_class(use_cache=use_cache, params=params)
+        # transport 为 http 时直接提交OA表单，不启动浏览器
+        sender_class = HttpEmailSender if EMAIL_CONFIG.get('transport', 'selenium') == 'http' else EmailSender
+        self.email_sender = sender_class()
+        
+    def start_metrics(self, run_name):
+        """为本次运行创建指标记录，提取和发送两个阶段共用"""
+        metrics = RunMetrics(run_name)
+        self.database_extractor.metrics = metrics
+        self.email_sender.metrics = metrics
+        return metrics
+    
+    def write_metrics(self, metrics, success):
+        """按 METRICS_CONFIG 输出本次运行的指标"""
+        if METRICS_CONFIG.get('enabled'):
+            metrics.write(success, METRICS_CONFIG['json_path'], METRICS_CONFIG.get('prometheus_path'))
+    
+    def run_full_process(self):
+        """运行完整的自动化流程
+
+        浏览器启动和OA登录不依赖报表文件，在后台线程中与数据提取同时进行，
+        两者都完成后再上传附件发送。
+        """
+        metrics = self.start_metrics('full_process')
+        success = False
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            self.logger.info("=" * 50)
+            self.logger.info("开始执行自动化数据提取与邮件发送流程")
+            self.logger.info("=" * 50)
+            
+            # 后台启动浏览器并登录OA系统
+            session_future = executor.submit(self.email_sender.prepare_session)
+            
+            # 报表在本地副本上执行时，副本过旧则先同步
+            if REPLICA_CONFIG.get('enabled') and not self.refresh_replica():
+                self.logger.error("本地副本同步失败，流程终止")
+                return False
+            
+            # 步骤1: 数据提取
+            self.logger.info("步骤1: 开始数据提取（浏览器同时在后台启动并登录）")
+            files = self.database_extractor.extract_and_save()
+            
+            # 内容与上次发送时相同：不生成报表，按配置跳过发送或发送提示邮件
+            if self.database_extractor.unchanged:
+                success = self.handle_unchanged(session_future)
+                return success
+            
+            if not files:
+                self.logger.error("数据提取失败，流程终止")
+                return False
+            
+            self.logger.info(f"数据提取成功，文件路径: {', '.join(files)}")
+            
+            # 步骤2: 邮件发送，等待后台登录完成
+            self.logger.info("步骤2: 开始邮件发送")
+            if not session_future.result():
+                self.logger.error("浏览器启动或OA登录失败，流程终止")
+                return False
+            
+            email_success = self.email_sender.send_files(files)
+            
+            if email_success:
+                self.logger.info("邮件发送成功")
+                self.database_extractor.commit_fingerprint()
+                self.logger.info("=" * 50)
+                self.logger.info("自动化流程执行完成")
+                self.logger.info("=" * 50)
+                success = True
+                return True
+            else:
+                self.logger.error("邮件发送失败")
+                return False
+                
+        except Exception as e:
+            self.logger.error(f"自动化流程执行失败: {str(e)}")
+            return False
+        
+        finally:
+            # 提取失败时也要等后台登录结束，再关闭浏览器
+            executor.shutdown(wait=True)
+            self.email_sender.close()
+            self.write_metrics(metrics, success)
+    
+    def refresh_replica(self, force=False):
+        """同步本地副本；force 为假时只在副本超过 max_age_minutes 未同步时同步"""
+        replica = LocalReplica(metrics=self.database_extractor.metrics)
+        if not force and not replica.is_stale():
+            self.logger.info(f"本地副本上次同步于 {replica.last_synced_at()}，无需同步")
+            return True
+        self.logger.info("开始同步本地副本")
+        return replica.sync_all()
+    
+    def handle_unchanged(self, session_future):
+        """报表内容未变化时的处理，返回是否成功"""
+        if FINGERPRINT_CONFIG.get('unchanged_action', 'skip') != 'notice':
+            self.logger.info("报表内容未变化，跳过本次邮件发送")
+            return True
+        
+        self.logger.info("报表内容未变化，发送提示邮件")
+        if not session_future.result():
+            self.logger.error("浏览器启动或OA登录失败，提示邮件未发送")
+            return False
+        
+        message = f"""
+            您好！
+            
+            今日数据与上次发送的报表相同，本次不再重复发送附件。
+            
+            检查时间：{datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}
+            
+            此邮件为系统自动发送，请勿回复。
+            """
+        return self.email_sender.send_notice(message)
+    
+    def test_system(self):
+        """测试系统各组件"""
+        self.logger.info("开始系统测试")
+        
+        # 测试数据库连接
+        self.logger.info("测试数据库连接...")
+        if self.database_extractor.test_connection():
+            self.logger.info("✓ 数据库连接测试通过")
+        else:
+            self.logger.error("✗ 数据库连接测试失败")
+            return False
+        
+        # 测试OA系统连接
+        self.logger.info("测试OA系统连接...")
+        if self.email_sender.test_oa_connection():
+            self.logger.info("✓ OA系统连接测试通过")
+        else:
+            self.logger.error("✗ OA系统连接测试失败")
+            return False
+        
+        self.logger.info("✓ 系统测试完成")
+        return True
+    
+    def run_test_extraction(self):
+        """运行测试数据提取"""
+        self.logger.info("运行测试数据提取")
+        metrics = self.start_metrics('extract')
+        files = self.database_extractor.extract_and_save()
+        self.write_metrics(metrics, files is not None)
+        
+        if self.database_extractor.unchanged:
+            self.logger.info("报表内容与上次发送时相同，未生成文件")
+            return files
+        
+        if files:
+            self.logger.info(f"测试数据提取成功: {', '.join(files)}")
+            return files
+        else:
+            self.logger.error("测试数据提取失败")
+            return None
+
+def print_usage():
+    """打印使用说明"""
+    print("""
+自动化数据提取与邮件发送系统
+
+使用方法:
+    python main.py [选项]
+
+选项:
+    --test        运行系统测试
+    --extract     仅运行数据提取测试
+    --run         运行完整自动化流程
+    --sync-replica  同步本地分析副本（REPLICA_CONFIG）
+    --help        显示此帮助信息
+    --no-cache    不使用查询结果缓存（与 --extract / --run 一起使用）
+    --param 名称[:类型]=值  设置报表查询的绑定变量，可重复使用；默认按字符串绑定，
+                  类型可为 int、float、date（日期格式为 YYYY-MM-DD）
+
+示例:
+    python main.py --test      # 测试系统连接
+    python main.py --extract   # 测试数据提取
+    python main.py --run       # 运行完整流程
+    python main.py --run --no-cache  # 忽略缓存，重新查询数据库
+    python main.py --run --param start_date:date=2025-07-01 --param dept=内科
+    """)
+
+# --param 名称:类型=值 中可用的类型，未指定类型时按字符串绑定
+PARAM_TYPES = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'date': lambda value: datetime.strptime(value, '%Y-%m-%d')
+}
+
+def parse_param_value(value, type_name='str'):
+    """按显式类型转换命令行参数值；默认保持字符串，避免 01 这样的编码丢失前导零"""
+    if type_name not in PARAM_TYPES:
+        raise ValueError(f"未知的参数类型: {type_name}（可用 {', '.join(PARAM_TYPES)}）")
+    return PARAM_TYPES[type_name](value)
+
+def parse_params(args):
+    """解析命令行中的 --param 名称[:类型]=值"""
+    params = {}
+    for index, arg in enumerate(args):
+        if arg.lower() == '--param' and index + 1 < len(args):
+            name, _, value = args[index + 1].partition('=')
+            name, _, type_name = name.partition(':')
+            params[name.strip().lower()] = parse_param_value(value.strip(), type_name.strip().lower() or 'str')
+    return params
+
+def main():
+    """主函数"""
+    # 确保输出目录存在
+    ensure_output_dir()
+    
+    # 解析命令行参数
+    if len(sys.argv) < 2:
+        print_usage()
+        return
+    
+    command = sys.argv[1].lower()
+    options = [arg.lower() for arg in sys.argv[2:]]
+    
+    try:
+        params = parse_params(sys.argv[2:])
+    except ValueError as e:
+        print(f"参数错误: {str(e)}")
+        print_usage()
+        return
+    
+    # 创建自动化系统实例
+    system = AutomationSystem(use_cache='--no-cache' not in options, params=params)
+    
+    try:
+        if command == "--test":
+            print("运行系统测试...")
+            if system.test_system():
+                print("系统测试通过")
+            else:
+                print("系统测试失败")
+    
+        elif command == "--extract":
+            print("运行数据提取测试...")
+            files = system.run_test_extraction()
+            if files:
+                print(f"数据提取测试成功: {', '.join(files)}")
+            elif files is not None:
+                print("数据提取测试成功，报表内容与上次发送时相同，未生成文件")
+            else:
+                print("数据提取测试失败")
+    
+        elif command == "--run":
+            print("运行完整自动化流程...")
+            if system.run_full_process():
+                print("自动化流程执行成功")
+            else:
+                print("自动化流程执行失败")
+    
+        elif command == "--sync-replica":
+            print("同步本地分析副本...")
+            if system.refresh_replica(force=True):
+                print("本地副本同步成功")
+            else:
+                print("本地副本同步失败")
+    
+        elif command == "--help":
+            print_usage()
+    
+        else:
+            print(f"未知命令: {command}")
+            print_usage()
+    
+    finally:
+        # 进程退出前关闭数据库连接池
+        close_pool()
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+查询结果缓存模块
+将查询结果（列名 + 数据批次）以压缩的pickle流保存在本地磁盘，
+在有效期内重复执行相同查询时直接读取缓存，不访问数据库
+"""
+
+import os
+import gzip
+import json
+import time
+import pickle
+import hashlib
+import logging
+
+
+class QueryCache:
+    """按SQL文本和绑定变量索引的磁盘结果缓存
+
+    缓存文件依次保存列名（及表结构）和各数据批次，读写都按批次流式进行。
+    超过有效期的条目视为失效；总大小超过上限时按写入时间从旧到新淘汰。
+    """
+
+    def __init__(self, cache_dir, ttl_seconds=1800, max_bytes=500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, sql, params=None):
+        """根据SQL文本和绑定变量计算缓存键"""
+        payload = json.dumps([sql.strip(), params or {}], sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl.gz")
+
+    def get(self, sql, params=None):
+        """查找有效的缓存条目，命中时返回 (列名, 批次生成器)，否则返回 None"""
+        path = self.entry_path(self.make_key(sql, params))
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            return None
+
+        if age > self.ttl_seconds:
+            self.logger.info(f"查询缓存已过期（{age:.0f} 秒），重新查询数据库")
+            self.remove(path)
+            return None
+
+        stream = gzip.open(path, 'rb')
+        try:
+            header = pickle.load(stream)
+        except Exception:
+            stream.close()
+            self.remove(path)
+            return None
+
+        # 早期版本的条目只保存列名
+        columns, schema = header if isinstance(header, tuple) else (header, None)
+        self.logger.info(f"命中查询缓存（{age:.0f} 秒前生成），跳过数据库查询")
+        return columns, self.read_batches(stream), schema
+
+    def read_batches(self, stream):
+        """逐批读出缓存中的数据"""
+        try:
+            while True:
+                try:
+                    yield pickle.load(stream)
+                except EOFError:
+                    break
+        finally:
+            stream.close()
+
+    def open_entry(self, sql, params, columns, schema=None):
+        """开始写入一个缓存条目，由调用方逐批追加并在读完后提交"""
+        return CacheEntry(self, self.entry_path(self.make_key(sql, params)), columns, schema)
+
+    def record(self, sql, params, columns, batches, schema=None):
+        """透传数据批次的同时写入缓存，全部批次读完后缓存条目才生效"""
+        entry = self.open_entry(sql, params, columns, schema)
+        completed = False
+        try:
+            for rows in batches:
+                entry.append(rows)
+                yield rows
+            completed = True
+        finally:
+            if completed:
+                entry.commit()
+            else:
+                entry.discard()
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        """删除过期条目，并在总大小超限时从最旧的条目开始淘汰"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pkl.gz'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+            self.logger.info(f"查询缓存超过 {self.max_bytes} 字节，淘汰: {os.path.basename(path)}")
+
+
+class CacheEntry:
+    """写入中的缓存条目，先写临时文件，提交时才替换为正式条目"""
+
+    def __init__(self, cache, path, columns, schema=None):
+        self.cache = cache
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.{id(self)}.tmp"
+        self.stream = gzip.open(self.temp_path, 'wb', compresslevel=1)
+        # 条目头部为列名和由游标描述得到的表结构
+        self.append((list(columns), schema))
+
+    def append(self, batch):
+        pickle.dump(batch, self.stream, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def commit(self):
+        self.stream.close()
+        os.replace(self.temp_path, self.path)
+        self.cache.evict()
+
+    def discard(self):
+        self.stream.close()
+        self.cache.remove(self.temp_path)
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+"""
+报表写入模块
+以流式方式将查询结果写入报表文件，不在内存中保留整张表
+"""
+
+import io
+import os
+import csv
+import gzip
+import logging
+import oracledb
+import openpyxl
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
+
+# 表头样式（与 DatabaseExtractor.save_to_excel 保持一致）
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+
+# 单张Excel工作表的最大行数（含表头）
+EXCEL_MAX_ROWS = 1048576
+
+# 支持的输出格式及其文件扩展名
+FORMAT_EXTENSIONS = {
+    'xlsx': '.xlsx',
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'parquet': '.parquet'
+}
+
+
+# Oracle列类型对应的Arrow类型（NUMBER 按精度和小数位数单独处理）
+ORACLE_ARROW_TYPES = {
+    oracledb.DB_TYPE_DATE: pa.timestamp('s'),
+    oracledb.DB_TYPE_TIMESTAMP: pa.timestamp('us'),
+    oracledb.DB_TYPE_TIMESTAMP_TZ: pa.timestamp('us'),
+    oracledb.DB_TYPE_TIMESTAMP_LTZ: pa.timestamp('us'),
+    oracledb.DB_TYPE_BINARY_FLOAT: pa.float64(),
+    oracledb.DB_TYPE_BINARY_DOUBLE: pa.float64(),
+    oracledb.DB_TYPE_BINARY_INTEGER: pa.int64(),
+    oracledb.DB_TYPE_BOOLEAN: pa.bool_(),
+    oracledb.DB_TYPE_VARCHAR: pa.string(),
+    oracledb.DB_TYPE_NVARCHAR: pa.string(),
+    oracledb.DB_TYPE_CHAR: pa.string(),
+    oracledb.DB_TYPE_NCHAR: pa.string(),
+    oracledb.DB_TYPE_LONG: pa.string(),
+    oracledb.DB_TYPE_LONG_NVARCHAR: pa.string(),
+    oracledb.DB_TYPE_CLOB: pa.string(),
+    oracledb.DB_TYPE_NCLOB: pa.string(),
+    oracledb.DB_TYPE_ROWID: pa.string(),
+    oracledb.DB_TYPE_UROWID: pa.string(),
+    oracledb.DB_TYPE_RAW: pa.binary(),
+    oracledb.DB_TYPE_LONG_RAW: pa.binary(),
+    oracledb.DB_TYPE_BLOB: pa.binary()
+}
+
+
+def arrow_type(column):
+    """由游标描述中的一列（名称、类型、显示长度、内部长度、精度、小数位数、可空）确定Arrow类型
+
+    NUMBER(p) 为整数（p ≤ 18 用 int64，更长用 decimal128），带小数位数或未指定精度的
+    NUMBER 用 float64，与 oracledb 列式读取一致；无法确定时返回 None。
+    """
+    type_code, precision, scale = column[1], column[4], column[5]
+    if type_code is oracledb.DB_TYPE_NUMBER:
+        if scale == 0 and precision:
+            return pa.int64() if precision <= 18 else pa.decimal128(precision, 0)
+        return pa.float64()
+    return ORACLE_ARROW_TYPES.get(type_code)
+
+
+def arrow_schema(description):
+    """由游标描述得到Arrow表结构，无法确定类型的列为 null 类型；全部无法确定（如SQLite副本）时返回 None"""
+    fields = [pa.field(column[0], arrow_type(column) or pa.null()) for column in description]
+    if all(pa.types.is_null(field.type) for field in fields):
+        return None
+    return pa.schema(fields)
+
+
+def resolve_schema(schema, table):
+    """确定写入文件的表结构：schema 中已知的列类型优先，其余取批次的实际类型，整列为空时按字符串处理"""
+    fields = []
+    for index, field in enumerate(table.schema):
+        field_type = schema.field(index).type if schema is not None else pa.null()
+        if pa.types.is_null(field_type):
+            field_type = field.type
+        if pa.types.is_null(field_type):
+            field_type = pa.string()
+        fields.append(pa.field(field.name, field_type))
+    return pa.schema(fields)
+
+
+def rows_to_table(columns, rows, schema=None):
+    """将一批行元组转换为Arrow表
+
+    schema 给出的列类型优先；未给出或为 null 类型的列按数据推断，整列为空时按字符串处理。
+    """
+    arrays = []
+    for index in range(len(columns)):
+        values = [row[index] for row in rows]
+        field_type = schema.field(index).type if schema is not None else pa.null()
+        if pa.types.is_null(field_type):
+            array = pa.array(values)
+            if pa.types.is_null(array.type):
+                array = array.cast(pa.string())
+        else:
+            try:
+                array = pa.array(values, type=field_type)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # 例如 Decimal 值写入 float64 列：先按值推断类型再转换
+                array = pa.array(values).cast(field_type, safe=False)
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+
+def table_to_rows(table):
+    """将Arrow表转换为行元组列表（用于逐单元格写入的xlsx，以及含需加引号文本的CSV批次）"""
+    return list(zip(*[column.to_pylist() for column in table.columns]))
+
+
+# csv.writer（QUOTE_MINIMAL）需要加引号的字符
+CSV_SPECIAL_PATTERN = r'[,"\r\n]'
+
+
+def csv_text_table(table):
+    """将Arrow批次的列转换为与 csv.writer 逐行输出相同的文本形式
+
+    日期时间按 str(datetime) 的格式（整秒时不带微秒）书写，布尔值写为 True/False，
+    其余类型沿用Arrow的文本格式。文本中含有逗号、引号或换行时返回 None：
+    pyarrow 会给这类批次中的所有文本加引号，由调用方改为逐行写出。
+    """
+    arrays = []
+    for column in table.columns:
+        column_type = column.type
+        if pa.types.is_string(column_type) or pa.types.is_large_string(column_type):
+            if pc.any(pc.match_substring_regex(column, CSV_SPECIAL_PATTERN)).as_py():
+                return None
+        elif pa.types.is_timestamp(column_type):
+            if column_type.tz is not None:
+                return None
+            if pc.any(pc.not_equal(pc.subsecond(column), 0)).as_py():
+                # 含小数秒时按微秒输出，整秒的值去掉小数部分
+                text = column.cast(pa.timestamp('us'), safe=False).cast(pa.string())
+                column = pc.replace_substring_regex(text, pattern=r'\.000000$', replacement='')
+            else:
+                # Oracle DATE 只有整秒，直接按秒输出
+                column = column.cast(pa.timestamp('s'), safe=False).cast(pa.string())
+        elif pa.types.is_boolean(column_type):
+            column = pc.if_else(column, 'True', 'False')
+        arrays.append(column)
+    return pa.Table.from_arrays(arrays, names=table.column_names)
+
+
+class ExcelSheetStream:
+    """write-only工作表的流式写入状态
+
+    列宽在数据流经时逐行累计最大值，不再回读工作表。
+    write-only工作表要求列宽在写出第一行之前确定，因此先缓存前
+    width_sample_rows 行用于计算列宽，之后的行直接写出。
+    当前工作表的数据行达到 max_rows 时，由所属写入器续开工作表（或工作簿），
+    续表沿用已确定的列宽和表头，整个过程只读取一遍数据。
+    """
+
+    def __init__(self, writer, sheet_name, width_sample_rows=1000, max_width=50, max_rows=EXCEL_MAX_ROWS - 1):
+        self.writer = writer
+        self.sheet_name = sheet_name
+        self.worksheet = writer.create_worksheet(sheet_name)
+        self.width_sample_rows = width_sample_rows
+        self.max_width = max_width
+        self.max_rows = max_rows
+        self.logger = logging.getLogger(__name__)
+        self.columns = None
+        self.widths = None
+        self.pending = []
+        self.part = 1
+        self.sheet_rows = 0
+        self.row_count = 0
+        self.closed = False
+
+    def set_columns(self, columns, schema=None):
+        """登记列名，表头在列宽确定后写出；单元格按值写入，不使用 schema"""
+        self.columns = list(columns)
+        self.widths = [len(str(name)) for name in self.columns]
+
+    def track_widths(self, row):
+        """用一行数据更新各列的最大宽度"""
+        widths = self.widths
+        for index, value in enumerate(row):
+            if value is None:
+                continue
+            length = len(str(value))
+            if length > widths[index]:
+                widths[index] = length
+
+    def write_header(self):
+        """应用列宽并写出表头"""
+        for index, width in enumerate(self.widths, start=1):
+            self.worksheet.column_dimensions[get_column_letter(index)].width = min(width + 2, self.max_width)
+
+        # 表头样式只设置一次
+        header = []
+        for name in self.columns:
+            cell = WriteOnlyCell(self.worksheet, value=name)
+            cell.font = HEADER_FONT
+            cell.fill = HEADER_FILL
+            cell.alignment = HEADER_ALIGNMENT
+            header.append(cell)
+        self.worksheet.append(header)
+
+    def flush_pending(self):
+        """写出表头和缓存的样本行"""
+        if self.pending is None or self.columns is None:
+            return
+
+        self.write_header()
+        for row in self.pending:
+            self.worksheet.append(row)
+        self.pending = None
+
+    def roll_over(self):
+        """当前工作表已满，续开下一张工作表"""
+        self.flush_pending()
+        self.part += 1
+        suffix = f"_{self.part}"
+        # Excel工作表名最长31个字符
+        title = self.sheet_name[:31 - len(suffix)] + suffix
+        self.worksheet = self.writer.create_worksheet(title, continuation=True)
+        self.sheet_rows = 0
+        self.write_header()
+        self.logger.info(f"工作表 {self.sheet_name} 已达 {self.max_rows} 行上限，续写到 {title}")
+
+    def append_rows(self, rows):
+        """向当前工作表写入不超过剩余容量的数据行"""
+        append = self.worksheet.append
+        for row in rows:
+            if self.pending is not None:
+                self.track_widths(row)
+                self.pending.append(row)
+                if len(self.pending) >= self.width_sample_rows:
+                    self.flush_pending()
+            else:
+                append(row)
+        self.sheet_rows += len(rows)
+
+    def write_rows(self, rows):
+        """写入一批数据行，超出当前工作表容量的部分写入续表"""
+        start = 0
+        while start < len(rows):
+            if self.sheet_rows >= self.max_rows:
+                self.roll_over()
+            chunk = rows[start:start + self.max_rows - self.sheet_rows]
+            self.append_rows(chunk)
+            start += len(chunk)
+        self.row_count += len(rows)
+
+    def write_arrow(self, table):
+        """写入一个Arrow批次；openpyxl只能逐单元格写入，这里按列转换为行"""
+        self.write_rows(table_to_rows(table))
+
+    def close(self):
+        """结束当前工作表"""
+        if self.closed:
+            return
+        self.flush_pending()
+        self.closed = True
+        self.logger.info(f"工作表 {self.sheet_name} 共 {self.part} 张，写入 {self.row_count} 条记录")
+
+
+class ExcelStreamWriter:
+    """基于openpyxl write-only工作簿的流式Excel写入器
+
+    每个工作表对应一个 ExcelSheetStream。openpyxl工作簿不是线程安全的，
+    多线程写入不同工作表时由调用方加锁串行化 write_rows。
+    超过行数上限时，rollover='sheet' 在同一工作簿内续开工作表，
+    rollover='file' 为每张续表新建一个工作簿文件。
+    """
+
+    def __init__(self, filepath, width_sample_rows=1000, max_width=50,
+                 max_rows=EXCEL_MAX_ROWS - 1, rollover='sheet'):
+        self.filepath = filepath
+        self.width_sample_rows = width_sample_rows
+        self.max_width = max_width
+        self.max_rows = max_rows
+        self.rollover = rollover
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.workbooks = [(filepath, self.workbook)]
+        self.sheets = []
+
+    def create_worksheet(self, title, continuation=False):
+        """新建工作表；按文件续写时续表放入新的工作簿"""
+        if continuation and self.rollover == 'file':
+            base, extension = os.path.splitext(self.filepath)
+            workbook = openpyxl.Workbook(write_only=True)
+            self.workbooks.append((f"{base}_{len(self.workbooks) + 1}{extension}", workbook))
+            return workbook.create_sheet(title)
+        return self.workbook.create_sheet(title)
+
+    def add_sheet(self, sheet_name, columns=None):
+        """按调用顺序新建工作表，返回其写入状态"""
+        sheet = ExcelSheetStream(
+            self,
+            sheet_name,
+            width_sample_rows=self.width_sample_rows,
+            max_width=self.max_width,
+            max_rows=self.max_rows
+        )
+        if columns is not None:
+            sheet.set_columns(columns)
+        self.sheets.append(sheet)
+        return sheet
+
+    def discard(self):
+        """放弃写入；工作簿尚未保存，不会留下文件"""
+        self.sheets = []
+
+    def save(self):
+        """结束写入并保存全部工作簿，返回文件路径列表"""
+        for sheet in self.sheets:
+            sheet.close()
+        for filepath, workbook in self.workbooks:
+            workbook.save(filepath)
+        return [filepath for filepath, _ in self.workbooks]
+
+
+class CsvStreamWriter:
+    """流式CSV写入器
+
+    使用带BOM的UTF-8编码，Excel双击即可正确显示中文；compress=True 时输出gzip压缩文件。
+    一个CSV文件只对应一张表，add_sheet 返回写入器自身。
+    """
+
+    def __init__(self, filepath, compress=False):
+        self.filepath = filepath
+        self.logger = logging.getLogger(__name__)
+        if compress:
+            self.raw = gzip.open(filepath, 'wb', compresslevel=6)
+        else:
+            self.raw = open(filepath, 'wb')
+        self.stream = io.TextIOWrapper(self.raw, encoding='utf-8-sig', newline='', write_through=True)
+        self.writer = csv.writer(self.stream)
+        self.columns = None
+        self.row_count = 0
+        self.closed = False
+
+    def add_sheet(self, sheet_name, columns=None):
+        if columns is not None:
+            self.set_columns(columns)
+        return self
+
+    def set_columns(self, columns, schema=None):
+        """写出表头；文本格式不使用 schema"""
+        self.columns = list(columns)
+        self.writer.writerow(self.columns)
+
+    def write_rows(self, rows):
+        """写入一批数据行"""
+        self.writer.writerows(rows)
+        self.row_count += len(rows)
+
+    def write_arrow(self, table):
+        """由Arrow直接编码写入一个批次，不产生逐行Python对象
+
+        行尾、引号和日期时间格式与逐行路径一致；文本含有需要加引号的字符时该批次改为逐行写出。
+        """
+        text_table = csv_text_table(table)
+        if text_table is None:
+            self.write_rows(table_to_rows(table))
+            return
+        # 表头（含BOM）已经由文本层写出，批次直接编码写入底层字节流
+        self.stream.flush()
+        pa_csv.write_csv(text_table, self.raw, write_options=pa_csv.WriteOptions(
+            include_header=False, quoting_style='none', eol='\r\n'
+        ))
+        self.row_count += table.num_rows
+
+    def close(self):
+        if self.closed:
+            return
+        self.stream.close()
+        self.closed = True
+        self.logger.info(f"CSV文件写入 {self.row_count} 条记录: {self.filepath}")
+
+    def discard(self):
+        """放弃写入并删除不完整的文件"""
+        if not self.closed:
+            self.stream.close()
+            self.closed = True
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def save(self):
+        """结束写入并关闭文件，返回文件路径列表"""
+        self.close()
+        return [self.filepath]
+
+
+class ParquetStreamWriter:
+    """流式Parquet写入器，每批数据直接转换为Arrow表写出
+
+    一个Parquet文件只对应一张表，add_sheet 返回写入器自身。文件的表结构以 set_columns 传入的
+    schema（由游标描述得到）为准，只有其中无法确定类型的列才按首批数据推断。
+    """
+
+    def __init__(self, filepath, compression='snappy'):
+        self.filepath = filepath
+        self.compression = compression
+        self.logger = logging.getLogger(__name__)
+        self.writer = None
+        self.schema = None
+        self.file_schema = None
+        self.columns = None
+        self.row_count = 0
+        self.closed = False
+
+    def add_sheet(self, sheet_name, columns=None):
+        if columns is not None:
+            self.set_columns(columns)
+        return self
+
+    def set_columns(self, columns, schema=None):
+        self.columns = list(columns)
+        self.schema = schema
+
+    def write_rows(self, rows):
+        """写入一批数据行"""
+        if not rows:
+            return
+        self.write_arrow(rows_to_table(self.columns, rows, self.file_schema or self.schema))
+
+    def write_arrow(self, table):
+        """直接写入一个Arrow批次"""
+        if table.num_rows == 0:
+            return
+        if self.writer is None:
+            self.file_schema = resolve_schema(self.schema, table)
+            self.writer = pq.ParquetWriter(self.filepath, self.file_schema, compression=self.compression)
+        if table.schema != self.file_schema:
+            table = table.cast(self.file_schema)
+        self.writer.write_table(table)
+        self.row_count += table.num_rows
+
+    def close(self):
+        if self.closed:
+            return
+        # 没有数据时也输出只含表头的空文件
+        if self.writer is None:
+            empty = pa.table({name: pa.array([], type=pa.string()) for name in (self.columns or [])})
+            self.writer = pq.ParquetWriter(self.filepath, resolve_schema(self.schema, empty), compression=self.compression)
+        self.writer.close()
+        self.closed = True
+        self.logger.info(f"Parquet文件写入 {self.row_count} 条记录: {self.filepath}")
+
+    def discard(self):
+        """放弃写入并删除不完整的文件"""
+        if self.writer is not None and not self.closed:
+            self.writer.close()
+        self.closed = True
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def save(self):
+        """结束写入并关闭文件，返回文件路径列表"""
+        self.close()
+        return [self.filepath]
+
+
+def create_writer(output_format, filepath, width_sample_rows=1000, max_rows=EXCEL_MAX_ROWS - 1, rollover='sheet'):
+    """按输出格式创建流式写入器，行数上限和续写方式只对xlsx有效"""
+    if output_format == 'xlsx':
+        return ExcelStreamWriter(filepath, width_sample_rows=width_sample_rows, max_rows=max_rows, rollover=rollover)
+    if output_format == 'csv':
+        return CsvStreamWriter(filepath)
+    if output_format == 'csv.gz':
+        return CsvStreamWriter(filepath, compress=True)
+    if output_format == 'parquet':
+        return ParquetStreamWriter(filepath)
+    raise ValueError(f"不支持的输出格式: {output_format}")
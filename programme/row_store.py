@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+本地列式行存储模块
+以Parquet分片保存增量提取的数据，并记录每个查询的高水位线
+"""
+
+import os
+import re
+import json
+import base64
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+from report_writers import rows_to_table, resolve_schema, table_to_rows
+
+
+def encode_watermark(value):
+    """将水位线转换为可写入JSON的形式"""
+    if isinstance(value, datetime):
+        return {'type': 'datetime', 'value': value.isoformat()}
+    return {'type': 'value', 'value': value}
+
+
+def definition_key(sql, params=None):
+    """查询定义（SQL文本和绑定变量）的哈希，定义变化后旧数据不能再沿用"""
+    definition = json.dumps({'sql': sql, 'params': params or {}}, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(definition.encode('utf-8')).hexdigest()
+
+
+def encode_schema(schema):
+    """将Arrow表结构转换为可写入JSON的文本"""
+    return base64.b64encode(schema.serialize().to_pybytes()).decode('ascii')
+
+
+def decode_schema(text):
+    """从JSON中的文本还原Arrow表结构"""
+    return pa.ipc.read_schema(pa.py_buffer(base64.b64decode(text)))
+
+
+def decode_watermark(state):
+    """从JSON形式还原水位线"""
+    if not state:
+        return None
+    if state['type'] == 'datetime':
+        return datetime.fromisoformat(state['value'])
+    return state['value']
+
+
+class RowStore:
+    """单个报表查询的本地行存储
+
+    每次增量提取写入一个新的Parquet分片，水位线在分片落盘后才更新，
+    中途失败时下次运行会重新拉取同一段数据。只适用于只追加不修改的表。
+
+    存储目录按查询定义的哈希区分（key 见 definition_key），SQL或绑定变量变化后
+    使用新的目录从头提取，同一查询旧定义的数据随即删除。
+    """
+
+    def __init__(self, store_dir, name, key=''):
+        self.key = key[:12]
+        self.directory = os.path.join(store_dir, f"{name}-{self.key}" if self.key else name)
+        self.state_path = os.path.join(self.directory, 'state.json')
+        self.logger = logging.getLogger(__name__)
+        self.remove_stale(store_dir, name)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def remove_stale(self, store_dir, name):
+        """删除同一查询按旧定义提取的存储目录"""
+        if not os.path.isdir(store_dir):
+            return
+        pattern = re.compile(rf"{re.escape(name)}(-[0-9a-f]{{12}})?")
+        for entry in os.listdir(store_dir):
+            path = os.path.join(store_dir, entry)
+            if pattern.fullmatch(entry) and path != self.directory and os.path.isdir(path):
+                shutil.rmtree(path)
+                self.logger.info(f"报表查询 {name} 的SQL或绑定变量已变化，删除旧的行存储 {entry}")
+
+    def load_state(self):
+        """读取存储状态（列名、水位线）"""
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_state(self, state):
+        """原子地写入存储状态"""
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, self.state_path)
+
+    def get_watermark(self):
+        """获取当前高水位线，尚未提取过时返回 None"""
+        return decode_watermark(self.load_state().get('watermark'))
+
+    @property
+    def columns(self):
+        return self.load_state().get('columns')
+
+    def stored_schema(self, state=None):
+        """存储的表结构：记录在状态文件中；早期版本未记录时取首个分片的结构"""
+        state = self.load_state() if state is None else state
+        if state.get('schema'):
+            return decode_schema(state['schema'])
+        parts = self.part_files()
+        return pq.read_schema(parts[0]) if parts else None
+
+    def part_files(self):
+        """按写入顺序列出数据分片"""
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith('part-') and name.endswith('.parquet')
+        )
+
+    def append(self, columns, batches, watermark_column, schema=None):
+        """将新增数据写入一个新分片并推进水位线，返回新增行数
+
+        schema 为由游标描述得到的表结构（见 report_writers.arrow_schema），首次写入时记录在状态文件中，
+        之后的分片都按记录的表结构写入，不受某一批数据中整列为空或恰好都是整数的影响。
+        """
+        state = self.load_state()
+        watermark_index = [name.upper() for name in columns].index(watermark_column.upper())
+        watermark = decode_watermark(state.get('watermark'))
+
+        # 已记录的表结构优先；游标描述无法提供类型时沿用已有分片的结构
+        if state.get('schema') or schema is None:
+            schema = self.stored_schema(state)
+
+        part_name = f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}.parquet"
+        temp_path = os.path.join(self.directory, part_name + '.tmp')
+        writer = None
+        count = 0
+        completed = False
+        try:
+            for rows in batches:
+                table = rows_to_table(columns, rows, schema)
+                if writer is None:
+                    schema = resolve_schema(schema, table)
+                    writer = pq.ParquetWriter(temp_path, schema)
+                writer.write_table(table.cast(schema))
+                count += len(rows)
+
+                batch_max = max(row[watermark_index] for row in rows)
+                if watermark is None or batch_max > watermark:
+                    watermark = batch_max
+            completed = True
+        finally:
+            if writer is not None:
+                writer.close()
+            # 提取中途失败时丢弃不完整的分片
+            if not completed and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        if count:
+            os.replace(temp_path, os.path.join(self.directory, part_name))
+            state['columns'] = list(columns)
+            state['schema'] = encode_schema(schema)
+            state['watermark'] = encode_watermark(watermark)
+            state['updated_at'] = datetime.now().isoformat()
+            self.save_state(state)
+        elif state.get('columns') is None:
+            state['columns'] = list(columns)
+            self.save_state(state)
+
+        self.logger.info(f"行存储 {os.path.basename(self.directory)} 新增 {count} 条记录，水位线: {watermark}")
+        return count
+
+    def iter_tables(self, batch_size=5000):
+        """按写入顺序逐批读出全部数据，每批为Arrow表
+
+        早期版本按首批数据推断表结构写入的分片，读出时转换为记录的表结构。
+        """
+        schema = self.stored_schema()
+        for path in self.part_files():
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=batch_size):
+                table = pa.Table.from_batches([batch])
+                if schema is not None and table.schema != schema:
+                    table = table.cast(schema)
+                yield table
+
+    def iter_batches(self, batch_size=5000):
+        """按写入顺序逐批读出全部数据，每批为行元组列表"""
+        for table in self.iter_tables(batch_size):
+            yield table_to_rows(table)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+运行指标模块
+记录每次运行各阶段的耗时和行数、字节数等计数，
+以每次运行一行JSON追加到记录文件，并输出Prometheus textfile collector格式的指标文件
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+# Prometheus 指标名前缀
+METRIC_PREFIX = 'report_pipeline'
+
+
+class RunMetrics:
+    """单次运行的分阶段耗时与计数
+
+    同一阶段多次进入（例如多个查询并发读取）时耗时累加，
+    因此并发阶段的耗时是各线程耗时之和，可能大于整体运行时间。
+    """
+
+    def __init__(self, run_name='report'):
+        self.run_name = run_name
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @contextmanager
+    def phase(self, name):
+        """统计代码块的耗时，计入指定阶段"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        """累加计数指标"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_record(self, success):
+        """生成本次运行的指标记录"""
+        with self.lock:
+            return {
+                'run': self.run_name,
+                'started_at': self.started_at.isoformat(),
+                'duration_seconds': round(time.perf_counter() - self.start, 3),
+                'success': bool(success),
+                'phases': {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                'counters': dict(self.counters)
+            }
+
+    def to_prometheus(self, record):
+        """将指标记录转换为Prometheus文本格式"""
+        run = record['run']
+        lines = [
+            f"# HELP {METRIC_PREFIX}_phase_seconds Wall time spent in each pipeline phase during the last run.",
+            f"# TYPE {METRIC_PREFIX}_phase_seconds gauge"
+        ]
+        for name, seconds in sorted(record['phases'].items()):
+            lines.append(f'{METRIC_PREFIX}_phase_seconds{{run="{run}",phase="{name}"}} {seconds}')
+
+        # 计数指标各自成为一个指标名，如 report_pipeline_rows_fetched
+        for name, value in sorted(record['counters'].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.append(f'{METRIC_PREFIX}_{name}{{run="{run}"}} {value}')
+
+        lines.extend([
+            f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge",
+            f'{METRIC_PREFIX}_run_duration_seconds{{run="{run}"}} {record["duration_seconds"]}',
+            f"# TYPE {METRIC_PREFIX}_last_run_success gauge",
+            f'{METRIC_PREFIX}_last_run_success{{run="{run}"}} {1 if record["success"] else 0}',
+            f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge",
+            f'{METRIC_PREFIX}_last_run_timestamp_seconds{{run="{run}"}} {self.started_at.timestamp():.0f}'
+        ])
+        return "\n".join(lines) + "\n"
+
+    def write(self, success, json_path, prometheus_path=None):
+        """追加JSON记录，并原子地替换Prometheus指标文件"""
+        record = self.to_record(success)
+        try:
+            os.makedirs(os.path.dirname(json_path) or '.', exist_ok=True)
+            with open(json_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            # textfile collector 可能随时读取，先写临时文件再替换
+            if prometheus_path:
+                os.makedirs(os.path.dirname(prometheus_path) or '.', exist_ok=True)
+                temp_path = prometheus_path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(self.to_prometheus(record))
+                os.replace(temp_path, prometheus_path)
+
+            phases = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in record['phases'].items())
+            self.logger.info(f"运行指标: 总耗时 {record['duration_seconds']:.2f}s; {phases}; {record['counters']}")
+
+        except Exception as e:
+            self.logger.error(f"写入运行指标失败: {str(e)}")
+
+        return record
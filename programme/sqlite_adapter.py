@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite数据库适配模块
+以 oracledb 连接和游标的接口形态包装 sqlite3，
+使 DatabaseExtractor 可以在没有Oracle实例时针对本地SQLite数据库运行（性能测试等）
+"""
+
+import re
+import sqlite3
+from datetime import datetime
+import pyarrow as pa
+
+# 与Oracle DATE一致：声明为 DATE 的列以 datetime 读出，datetime 参数按ISO格式写入
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('DATE', lambda value: datetime.fromisoformat(value.decode()))
+
+# SQL中的命名绑定变量，SQLite与Oracle同样使用 :name 形式
+BIND_NAME = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+
+class SqliteCursor:
+    """oracledb 游标形态的 sqlite3 游标包装"""
+
+    def __init__(self, connection):
+        self.cursor = connection.cursor()
+        self.arraysize = 100
+        self.prefetchrows = 2
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def execute(self, sql, params=None):
+        self.cursor.execute(sql, params or {})
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self.cursor.executemany(sql, seq_of_params)
+
+    def parse(self, sql):
+        """只获取列信息：以空结果执行一次，未提供的绑定变量按 NULL 处理"""
+        params = {name: None for name in BIND_NAME.findall(sql)}
+        self.cursor.execute(f"SELECT * FROM ({sql}) LIMIT 0", params)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self.cursor.fetchmany(size or self.arraysize)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SqliteConnection:
+    """oracledb 连接形态的 sqlite3 连接包装"""
+
+    def __init__(self, db_path):
+        self.connection = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+
+    def cursor(self):
+        return SqliteCursor(self.connection)
+
+    def fetch_df_batches(self, sql, parameters=None, size=5000):
+        """按批次返回Arrow表，对应 oracledb 的 fetch_df_batches"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, parameters or {})
+            columns = [col[0] for col in cursor.description]
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    break
+                yield pa.table({name: list(values) for name, values in zip(columns, zip(*rows))})
+        finally:
+            cursor.close()
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def connection_factory(db_path):
+    """返回打开指定SQLite数据库的连接工厂，可传给 DatabaseExtractor"""
+    return lambda: SqliteConnection(db_path)